@@ -0,0 +1,38 @@
+"""
+Save time, load time and bytes on disk of each snapshot codec in utils.json_io.
+
+    python -m benchmarks.codecs [rows]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.transaction_memory import make_rows
+from utils.json_io import CODECS
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    items = [(row["id"], row) for row in make_rows(count)]
+    print(f"rows: {count:,}")
+    print(f"{'codec':>8} {'save':>8} {'load':>8} {'bytes':>12}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, codec in CODECS.items():
+            filepath = os.path.join(tmp, "transactions" + codec.suffix)
+
+            start = time.perf_counter()
+            codec.save_items(filepath, items)
+            saved = time.perf_counter() - start
+
+            start = time.perf_counter()
+            loaded = sum(1 for _ in codec.iter_items(filepath))
+            load_time = time.perf_counter() - start
+
+            assert loaded == count
+            print(f"{name:>8} {saved:7.2f}s {load_time:7.2f}s {os.path.getsize(filepath):12,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Rows/sec and peak RSS of Exporter.export_excel: a regular workbook vs the streaming write-only one,
+plain and with typed columns / one sheet per month. Each mode runs in its own process, fed by a row
+generator, so the peak RSS is the exporter's own.
+
+    python -m benchmarks.excel_export [rows]
+"""
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+from core.export import Exporter
+
+MODES = {
+    "regular": dict(write_only=False),
+    "write-only": dict(write_only=True),
+    "typed": dict(write_only=True, typed_columns=True),
+    "typed+months": dict(write_only=True, typed_columns=True, split_by_month=True),
+}
+
+
+# same shape as benchmarks.transaction_memory.make_rows, generated lazily
+def iter_rows(count):
+    random.seed(42)
+    categories = ["Food", "Rent", "Utilities", "Transport", "Entertainment", "Health", "Shopping", "Other"]
+    for _ in range(count):
+        yield {
+            "id": str(uuid.uuid4()),
+            "type": random.choice(["income", "expense"]),
+            "amount": round(random.uniform(1, 5000), 2),
+            "category": random.choice(categories),
+            "date": f"{random.randint(2015, 2025)}-{random.randint(1, 12):02d}-{random.randint(1, 28):02d}",
+            "description": None,
+        }
+
+
+# runs in the child process: export and print "seconds peak_rss_kb"
+def run_mode(mode, count):
+    start = time.perf_counter()
+    Exporter.export_excel(iter_rows(count), f"bench_{mode}.xlsx", **MODES[mode])
+    seconds = time.perf_counter() - start
+    print(f"{seconds} {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f"rows: {count:,}")
+    print(f"{'mode':>14} {'time':>8} {'rows/sec':>10} {'peak RSS':>10}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, HOME=tmp)    # the exporter writes to ~/Downloads
+        for mode in MODES:
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.excel_export", "--mode", mode, str(count)],
+                env=env, capture_output=True, text=True, check=True,
+            ).stdout
+            seconds, peak_kb = output.split()[-2:]
+            seconds = float(seconds)
+            print(f"{mode:>14} {seconds:7.2f}s {count / seconds:10,.0f} {int(peak_kb) / 1024:8.0f} MB")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "--mode":
+        run_mode(sys.argv[2], int(sys.argv[3]))
+    else:
+        main()
@@ -0,0 +1,37 @@
+"""
+Cold-start time of JsonStorage.load: parsing the json snapshot vs reading its snapshot cache.
+
+    python -m benchmarks.startup [rows]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.transaction_memory import make_rows
+from core.storage import JsonStorage
+from utils.json_io import save_data
+
+
+def timed_load(filepath):
+    start = time.perf_counter()
+    transactions = JsonStorage(filepath).load()
+    return time.perf_counter() - start, len(transactions)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    with tempfile.TemporaryDirectory() as tmp:
+        filepath = os.path.join(tmp, "transactions.json")
+        save_data(filepath, {row["id"]: row for row in make_rows(count)})
+
+        parsed, rows = timed_load(filepath)     # no cache yet: parses the json and writes the cache
+        cached, _ = timed_load(filepath)
+
+    print(f"rows: {rows:,}")
+    print(f"  json: {parsed:6.2f}s")
+    print(f" cache: {cached:6.2f}s ({cached / parsed:.0%} of json)")
+
+
+if __name__ == "__main__":
+    main()
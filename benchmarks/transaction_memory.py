@@ -0,0 +1,67 @@
+"""
+Per-row memory of Transaction objects, compared with the previous plain-attribute layout.
+
+    python -m benchmarks.transaction_memory [rows]
+"""
+import gc
+import json
+import random
+import sys
+import tracemalloc
+import uuid
+
+from core.transaction import Transaction
+
+
+class LegacyTransaction:
+    # the old layout: per-instance __dict__, str date, float amount, no interning
+    def __init__(self, type, amount, category, date, id=None, description=None):
+        self.id = id if id is not None else str(uuid.uuid4())
+        self.type = type
+        self.amount = amount
+        self.category = category
+        self.date = date
+        self.description = description
+
+    @classmethod
+    def from_dict(cls, transaction):
+        return cls(transaction['type'], transaction['amount'], transaction['category'], transaction['date'],
+                   id=transaction.get('id'), description=transaction.get('description'))
+
+
+# rows round-tripped through json so every string is a fresh object, as on load
+def make_rows(count):
+    random.seed(42)
+    categories = ["Food", "Rent", "Utilities", "Transport", "Entertainment", "Health", "Shopping", "Other"]
+    rows = [{
+        "id": str(uuid.uuid4()),
+        "type": random.choice(["income", "expense"]),
+        "amount": round(random.uniform(1, 5000), 2),
+        "category": random.choice(categories),
+        "date": f"{random.randint(2015, 2025)}-{random.randint(1, 12):02d}-{random.randint(1, 28):02d}",
+        "description": None,
+    } for _ in range(count)]
+    return json.loads(json.dumps(rows))
+
+
+# bytes per row that stay alive once the raw json rows are dropped
+def measure(cls, count):
+    gc.collect()
+    tracemalloc.start()
+    objects = [cls.from_dict(row) for row in make_rows(count)]
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return current / count
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f"rows: {count:,}")
+    for label, cls in (("legacy", LegacyTransaction), ("compact", Transaction)):
+        print(f"{label:>8}: {measure(cls, count):7.1f} bytes/row")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+class MutationBatch:
+    """
+    Changes made inside ExpenseManager.batch(): the mutation records to persist at exit, the state
+    every touched txn had before the batch (for rollback) and the state the indexes still hold for
+    txns changed since the indexes were last brought up to date (None = not indexed / did not exist).
+    Past MAX_RECORDS queued records the batch stops queueing and is persisted with one full save.
+    """
+
+    MAX_RECORDS = 10_000
+
+    def __init__(self):
+        self.records = []
+        self.save_all = False       # too many records: rewrite everything at exit instead
+        self.originals = {}         # txn_id -> Transaction copy from before the batch, or None
+        self.unindexed = {}         # txn_id -> Transaction copy the indexes still hold, or None
+        self.indexed_during = False # whether pending changes were already pushed into the indexes
+
+
+    def add_record(self, record):
+        if self.save_all:
+            return
+        self.records.append(record)
+        if len(self.records) > self.MAX_RECORDS:
+            self.records = []
+            self.save_all = True
+
+
+    # remember the state of a txn before its first change (in the batch, and since the last index sync)
+    def touch(self, txn_id, txn):
+        if txn_id in self.originals and txn_id in self.unindexed:
+            return
+        state = txn.copy() if txn is not None else None
+        self.originals.setdefault(txn_id, state)
+        self.unindexed.setdefault(txn_id, state)
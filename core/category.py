@@ -9,7 +9,7 @@ class CategoryManager:
     def load_categories(self):
         raw_user_data = load_user_info(self.user_id)
         if raw_user_data and "categories" in raw_user_data:
-            return raw_user_data["categories"]
+            return {type_: list(names) for type_, names in raw_user_data["categories"].items()}
         else:
             raise ValueError(f"Categories not found for user {self.user_id}")
         
@@ -0,0 +1,156 @@
+import os
+import json
+import uuid
+from pathlib import Path
+
+
+class ChangeLog:
+    """
+    Append-only log of which txn ids were added, updated or deleted, one [seq, op, id] json line per
+    persisted change with an increasing sequence number. Readers remember the seq and byte offset they
+    stopped at (a watermark) and read only what was appended after it, so asking for the changes since
+    the last export costs the churn since then, not the size of the ledger.
+    A new log starts with a [0, "generation", id] line: if the file is deleted and started over its seqs
+    begin at 1 again, and the new generation id tells readers their watermark no longer applies.
+    """
+
+    TAIL_BLOCK = 4096   # bytes read from the end of the file to find the last seq
+    GENERATION = "generation"
+
+    def __init__(self, filepath):
+        self.filepath = Path(filepath)
+        self.last_seq = self._read_last_seq()
+
+
+    # append [(op, txn_id)] with a single write, returns the seq of the last one. The seq is taken
+    # from the file's tail each time, so two managers of the same ledger never reuse one
+    def append(self, changes):
+        if not changes:
+            return self.last_seq
+
+        with open(self.filepath, 'a+b') as file:
+            tail = self._read_tail(file)
+            self.last_seq = self._last_seq_in(tail)
+            lines = []
+            for op, txn_id in changes:
+                self.last_seq += 1
+                lines.append(json.dumps([self.last_seq, op, txn_id], separators=(",", ":")) + "\n")
+            data = "".join(lines).encode('utf-8')
+            if not tail:
+                data = self._header() + data
+            elif not tail.endswith(b"\n"):
+                data = b"\n" + data        # the last write was torn: start on a fresh line
+            file.write(data)
+        return self.last_seq
+
+
+    # generation id from the log's first line, starting the log if there is none yet.
+    # None for a log written before generations existed
+    def generation(self):
+        with open(self.filepath, 'a+b') as file:
+            if file.seek(0, os.SEEK_END) == 0:
+                file.write(self._header())
+            file.seek(0)
+            try:
+                seq, op, generation = json.loads(file.readline())
+            except (ValueError, TypeError):
+                return None
+        return generation if seq == 0 and op == self.GENERATION else None
+
+
+    # (last seq, end offset): a watermark covering everything logged so far, read from the file
+    # itself since another manager may have appended to it (or started it over) in the meantime
+    def end(self):
+        try:
+            with open(self.filepath, 'rb') as file:
+                self.last_seq = self._last_seq_in(self._read_tail(file))
+                return self.last_seq, file.tell()
+        except OSError:
+            return 0, 0
+
+
+    # ({txn_id: "add" | "update" | "delete"}, last seq, end offset) for the changes after seq.
+    # Several changes of one id collapse into one: added and deleted since then -> left out,
+    # otherwise deleted -> "delete", added -> "add", anything else -> "update".
+    # offset is where the reader stopped last time; without it (or if it no longer lines up) the
+    # whole log is scanned
+    def changes_since(self, seq=0, offset=None):
+        if not self.filepath.exists():
+            return {}, seq, 0
+
+        with open(self.filepath, 'rb') as file:
+            if offset is None or not self._starts_after(file, offset, seq):
+                offset = 0
+            file.seek(offset)
+
+            first_ops, last_ops = {}, {}
+            last_seq = seq
+            for line in file:
+                if not line.endswith(b"\n"):
+                    break       # still being written (or torn): picked up next time
+                offset += len(line)
+                try:
+                    entry_seq, op, txn_id = json.loads(line)
+                except ValueError:
+                    continue    # torn by a crash and then appended to, the next lines are fine
+                if entry_seq <= seq:
+                    continue
+                first_ops.setdefault(txn_id, op)
+                last_ops[txn_id] = op
+                last_seq = entry_seq
+
+        changes = {}
+        for txn_id, last_op in last_ops.items():
+            first_op = first_ops[txn_id]
+            if last_op == "delete":
+                if first_op != "add":
+                    changes[txn_id] = "delete"
+            else:
+                changes[txn_id] = "add" if first_op == "add" else "update"
+        return changes, last_seq, offset
+
+
+    # whether offset is the end of the file or the start of the entry right after seq
+    @staticmethod
+    def _starts_after(file, offset, seq):
+        file.seek(0, os.SEEK_END)
+        if offset > file.tell():
+            return False
+        if offset == file.tell():
+            return True
+        file.seek(offset)
+        try:
+            return json.loads(file.readline())[0] == seq + 1
+        except (ValueError, IndexError, TypeError):
+            return False
+
+
+    @classmethod
+    def _header(cls):
+        return (json.dumps([0, cls.GENERATION, uuid.uuid4().hex], separators=(",", ":")) + "\n").encode('utf-8')
+
+
+    def _read_last_seq(self):
+        try:
+            with open(self.filepath, 'rb') as file:
+                return self._last_seq_in(self._read_tail(file))
+        except OSError:
+            return 0
+
+
+    # the last TAIL_BLOCK bytes of an open log
+    @classmethod
+    def _read_tail(cls, file):
+        size = file.seek(0, os.SEEK_END)
+        file.seek(max(0, size - cls.TAIL_BLOCK))
+        return file.read()
+
+
+    @staticmethod
+    def _last_seq_in(tail):
+        for line in reversed(tail.splitlines()):
+            try:
+                return json.loads(line)[0]
+            except (ValueError, IndexError, TypeError):
+                continue    # torn last line, or the cut-off first one
+        return 0
@@ -0,0 +1,14 @@
+class DashboardSnapshot:
+    """Numbers shown on the login dashboard, computed together for one day and its month."""
+
+    def __init__(self, today, today_summary, month_summary, top_categories, top_n, version):
+        self.today = today                      # datetime.date
+        self.today_summary = today_summary
+        self.month_summary = month_summary
+        self.top_categories = top_categories    # [(category, amount)], largest first
+        self.top_n = top_n
+        self.version = version                  # manager version the numbers were computed at
+
+    @property
+    def month(self):
+        return self.today.strftime("%Y-%m")
@@ -0,0 +1,121 @@
+import re
+from datetime import datetime
+
+from core.export import Exporter
+from utils.json_io import load_user_info, save_user_setting
+
+
+class DeltaResult:
+    """What one delta export sent: counts per op, the change log seqs it covers and the file written."""
+
+    def __init__(self, target, from_seq, to_seq):
+        self.target = target
+        self.from_seq = from_seq
+        self.to_seq = to_seq
+        self.full = from_seq is None    # first export to the target: every txn
+        self.added = 0
+        self.updated = 0
+        self.deleted = 0
+        self.filename = None            # None when nothing changed (no file is written)
+        self.ok = True
+
+
+    @property
+    def total(self):
+        return self.added + self.updated + self.deleted
+
+
+class DeltaExport:
+    """
+    Exports what changed in a user's ledger since the last export to a target (e.g. "accounting"),
+    read from the manager's change log: txns added or updated since the target's watermark with op
+    "add" / "update", and {"op": "delete", "id": ...} tombstones for deleted ones. The first export
+    to a target has no watermark and sends every txn as "add". Watermarks (change log seq, byte
+    offset and generation) are kept per target in the user's account record and only move once the
+    file is written, so a failed run is simply sent again next time. A watermark taken from an
+    earlier generation of the change log (deleted and started over) is ignored, and everything is
+    sent again.
+    """
+
+    FORMATS = ("ndjson", "json", "csv")
+    FIELDNAMES = ["op"] + Exporter.FIELDNAMES
+    SETTING = "export_watermarks"
+
+    def __init__(self, manager, user_id, target="default"):
+        if manager.changelog is None:
+            raise ValueError("Delta export needs a manager that tracks changes.")
+        self.manager = manager
+        self.user_id = user_id
+        self.target = target
+
+
+    # {"seq", "offset", "generation", "exported_at"} of the last export to the target, None before the
+    # first one or when it belongs to another generation of the change log
+    def watermark(self):
+        user = load_user_info(self.user_id) or {}
+        mark = user.get(self.SETTING, {}).get(self.target)
+        if mark is not None and mark.get("generation") != self.manager.changelog.generation():
+            return None
+        return mark
+
+
+    # write the changes since the watermark to exports/ and move the watermark past them
+    def export(self, extension="ndjson"):
+        if extension not in self.FORMATS:
+            raise ValueError(f"Delta export format must be one of: {', '.join(self.FORMATS)}")
+
+        generation = self.manager.changelog.generation()
+        mark = self.watermark()
+        if mark is None:
+            seq, offset = self.manager.changelog.end()
+            changes = {txn_id: "add" for txn_id in self.manager.filter_transactions()}
+            result = DeltaResult(self.target, None, seq)
+        else:
+            changes, seq, offset = self.manager.changelog.changes_since(mark["seq"], mark.get("offset"))
+            result = DeltaResult(self.target, mark["seq"], seq)
+
+        if changes:
+            result.filename = self._filename(result, extension)
+            records = self._records(changes, result)
+            if extension == "csv":
+                result.ok = Exporter.export_csv(records, result.filename, fieldnames=self.FIELDNAMES)
+            elif extension == "json":
+                result.ok = Exporter.export_json(records, result.filename)
+            else:
+                result.ok = Exporter.export_ndjson(records, result.filename)
+
+        if result.ok and (mark is None or seq != mark["seq"]):
+            self._save_watermark(seq, offset, generation)
+        return result
+
+
+    # export records for the changes, counting them on result as they are written
+    def _records(self, changes, result):
+        for txn_id, op in changes.items():
+            if op == "delete":
+                result.deleted += 1
+                yield {"op": "delete", "id": txn_id}
+                continue
+
+            txn = self.manager.get_transaction(txn_id)
+            if txn is None:
+                continue
+            if op == "add":
+                result.added += 1
+            else:
+                result.updated += 1
+            yield {"op": op, **txn.to_dict()}
+
+
+    def _filename(self, result, extension):
+        target = re.sub(r"[^\w-]+", "_", self.target)
+        span = "full" if result.full else f"{result.from_seq + 1}-{result.to_seq}"
+        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        return f"exports/delta_{target}_{span}_{timestamp}.{extension}"
+
+
+    def _save_watermark(self, seq, offset, generation):
+        user = load_user_info(self.user_id) or {}
+        marks = dict(user.get(self.SETTING, {}))
+        marks[self.target] = {"seq": seq, "offset": offset, "generation": generation, "exported_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+        save_user_setting(self.user_id, self.SETTING, marks)
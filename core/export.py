@@ -1,23 +1,77 @@
+import re
 import csv
 import json
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Flowable
 from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.lib import colors
 from reportlab.lib.units import inch
 from reportlab.lib.colors import HexColor
 from reportlab.lib.enums import TA_CENTER,  TA_LEFT
-from reportlab.platypus import KeepTogether
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, date
+from itertools import chain
+from contextlib import contextmanager
 import os
 
 from utils.display import print_error, print_success
 
+MONTH = re.compile(r"\d{4}-(0[1-9]|1[0-2])")
+
+
+class ChunkedTable(Flowable):
+    """
+    Rows of a long pdf table, laid out one page at a time: each split builds a Table of the next
+    chunk_rows rows (more than a page holds), keeps the part that fits the frame and leaves the
+    remaining rows to a new ChunkedTable. Every page gets one table with its own header, layout work
+    stays linear, and only the current page's Table exists at any time.
+    """
+
+    def __init__(self, header, rows, chunk_rows, col_widths, style, start=0):
+        super().__init__()
+        self.header = header
+        self.rows = rows
+        self.chunk_rows = chunk_rows
+        self.col_widths = col_widths
+        self.style = style
+        self.start = start
+
+
+    def wrap(self, availWidth, availHeight):
+        return availWidth, availHeight + 1     # never drawn itself
+
+
+    def split(self, availWidth, availHeight):
+        end = self.start + self.chunk_rows
+        table = Table([self.header] + self.rows[self.start:end], colWidths=self.col_widths, repeatRows=1)
+        table.setStyle(self.style)
+
+        if table.wrap(availWidth, availHeight)[1] > availHeight:
+            parts = table.split(availWidth, availHeight)
+            if not parts:
+                return []       # not even one row fits: the frame moves on and asks again
+            table = parts[0]
+            end = self.start + table._nrows - 1     # rows that fit, minus the header
+
+        if end >= len(self.rows):
+            return [table]
+        return [table, ChunkedTable(self.header, self.rows, self.chunk_rows, self.col_widths, self.style, end)]
+
 
 class Exporter:
     
+    FIELDNAMES = ["id", "type", "amount", "category", "date", "description"]
+    COUNT_WIDTH = 20    # room left for the record count patched into a streamed json export
+    
+    EXCEL_WRITE_ONLY_ROWS = 10_000      # lists this long (and any other iterable) use a streaming write-only workbook
+    EXCEL_DATE_FORMAT = "yyyy-mm-dd"
+    EXCEL_AMOUNT_FORMAT = "#,##0.00"
+    EXCEL_COLUMN_WIDTHS = {"A": 38, "C": 12, "D": 16, "E": 12, "F": 40}
+    
+    PDF_TABLE_ROWS = 40     # rows laid out per pdf page attempt, more than a page of single-line rows holds
+    
     # ================================ Utility Functions ================================ #
     
     # for getting users path
@@ -27,27 +81,44 @@ class Exporter:
         return str(Path.home() / "Downloads")
     
     
-    # validate data before feeding to pdf
+    # records of any iterable of dicts / objects with to_dict() as a lazy iterator (only the first item
+    # is looked at up front), None when it is empty or invalid
     @staticmethod
-    def _validate_data(data, filename):
+    def _iter_records(data, filename):
+        items = iter(data)
+        first = next(items, None)
         
-        if not isinstance(data, list):
-            print_error("Data must be a list!")
-            return False
-        
-        if len(data) == 0:
+        if first is None:
             print_error("Data list is empty!")
-            return False
+            return None
         
-        sample_size = min(3, len(data))
+        if not (isinstance(first, dict) or hasattr(first, 'to_dict')):
+            print_error(f"{filename}: Items must be dictionaries or have to_dict() method")
+            return None
         
-        for i in range(sample_size):
-            item = data[i]
-            if not (isinstance(item, dict) or hasattr(item, 'to_dict')):
-                print_error(f"{filename}: Items must be dictionaries or have to_dict() method")
-                return False
-            
-        return True
+        return (item if isinstance(item, dict) else item.to_dict() for item in chain([first], items))
+    
+    
+    # full path in the downloads folder, creating its folder
+    @staticmethod
+    def _output_path(filename):
+        filepath = os.path.join(Exporter.get_downloads_path(), filename)
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        return filepath
+    
+    
+    # temp path to write instead of filepath: renamed over it when the block finishes, removed if the
+    # block fails, so a failed or interrupted export never leaves a partial file behind
+    @staticmethod
+    @contextmanager
+    def _atomic_path(filepath):
+        tmp_path = f"{filepath}.part"
+        try:
+            yield tmp_path
+            os.replace(tmp_path, filepath)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
     
     
     
@@ -55,26 +126,22 @@ class Exporter:
     
     
     
-    # csv file export
+    # csv file export, streamed row by row from any iterable (fields missing from a record are left empty)
     @staticmethod     
-    def export_csv(data, filename):
-        if not Exporter._validate_data(data, filename):
+    def export_csv(data, filename, fieldnames=None):
+        records = Exporter._iter_records(data, filename)
+        if records is None:
             return False
         
-        # getting filepth
-        downloads_path = Exporter.get_downloads_path()
-        filepath = os.path.join(downloads_path, filename)
-        
-        # ensure folder exists
-        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        filepath = Exporter._output_path(filename)
         
         try:
-            with open(filepath, 'w', newline='', encoding='utf-8') as file:
-                writer = csv.DictWriter(file, fieldnames=["id", "type", "amount", "category", "date", "description"])
+            with Exporter._atomic_path(filepath) as tmp_path, open(tmp_path, 'w', newline='', encoding='utf-8') as file:
+                writer = csv.DictWriter(file, fieldnames=fieldnames or Exporter.FIELDNAMES)
                 writer.writeheader()
                 
                 rows_written = 0
-                for item in data:
+                for item in records:
                     writer.writerow(item)
                     rows_written += 1
                     
@@ -86,36 +153,37 @@ class Exporter:
             return False
      
      
-    # json file export     
+    # json file export: {"metadata": {...}, "data": [...]} streamed one record per line from any iterable;
+    # total_records is left as blank padding and patched in once the records are written
     @staticmethod
-    def export_json(data: list, filename: str):
-        
-        if not Exporter._validate_data(data, filename):
+    def export_json(data, filename: str):
+        records = Exporter._iter_records(data, filename)
+        if records is None:
             return False
         
-        downloads_path = Exporter.get_downloads_path()
-        filepath = os.path.join(downloads_path, filename)
-        # ensure folder exists
-        os.makedirs(os.path.dirname(filepath), exist_ok=True)
-        
-        # metadata for json 
-        metadata =  {
-            "export_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "data_type": "transactions", 
-            "total_records": len(data)
-        }
-        
-        # whole data
-        complete_structure = {
-            "metadata": metadata,
-            "data": data
-        }
+        filepath = Exporter._output_path(filename)
+        export_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
         try:
-            with open(filepath, 'w', encoding='utf-8') as file:
-                json.dump(complete_structure, file, indent=2)
+            with Exporter._atomic_path(filepath) as tmp_path, open(tmp_path, 'w', encoding='utf-8') as file:
+                file.write('{\n  "metadata": {\n')
+                file.write(f'    "export_date": {json.dumps(export_date)},\n')
+                file.write('    "data_type": "transactions",\n')
+                file.write('    "total_records": ')
+                count_position = file.tell()
+                file.write(" " * Exporter.COUNT_WIDTH + '\n  },\n  "data": [')
                 
-            print_success(f"Exported {len(data)} records to JSON: {filepath}")
+                rows_written = 0
+                for item in records:
+                    file.write(",\n    " if rows_written else "\n    ")
+                    file.write(json.dumps(item))
+                    rows_written += 1
+                file.write("\n  ]\n}\n" if rows_written else "]\n}\n")
+                
+                file.seek(count_position)
+                file.write(str(rows_written).ljust(Exporter.COUNT_WIDTH))
+                
+            print_success(f"Exported {rows_written} records to JSON: {filepath}")
             return True
             
         except Exception as e:
@@ -123,51 +191,88 @@ class Exporter:
             return False
     
     
-    # excel file export
+    # newline-delimited json export: one record object per line, streamed from any iterable
     @staticmethod
-    def export_excel(data: list, filename: str):
-        
-        if not Exporter._validate_data(data, filename):
+    def export_ndjson(data, filename: str):
+        records = Exporter._iter_records(data, filename)
+        if records is None:
             return False
         
-        downloads_path = Exporter.get_downloads_path()
-        filepath = os.path.join(downloads_path, filename)
-        # ensure folder exists
-        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        filepath = Exporter._output_path(filename)
         
         try:
-            # Create a new workbook
-            workbook = Workbook()
+            with Exporter._atomic_path(filepath) as tmp_path, open(tmp_path, 'w', encoding='utf-8') as file:
+                rows_written = 0
+                for item in records:
+                    file.write(json.dumps(item) + "\n")
+                    rows_written += 1
+                
+            print_success(f"Exported {rows_written} records to NDJSON: {filepath}")
+            return True
             
-            # Select the active sheet 
-            sheet = workbook.active
-            sheet.title = "Transactions"  # Rename the sheet
+        except Exception as e:
+            print_error(f"NDJSON export failed: {e}")
+            return False
+    
+    
+    # excel file export from any iterable. Large inputs go through a write-only workbook, which streams
+    # rows to disk instead of keeping every cell in memory (write_only=True/False forces either mode).
+    # typed_columns stores real dates and numeric amounts with number formats, split_by_month writes one
+    # sheet per "YYYY-MM" (irregular dates go to "Other")
+    @staticmethod
+    def export_excel(data, filename: str, typed_columns=False, split_by_month=False, write_only=None):
+        records = Exporter._iter_records(data, filename)
+        if records is None:
+            return False
+        
+        filepath = Exporter._output_path(filename)
+        if write_only is None:
+            write_only = not isinstance(data, (list, tuple)) or len(data) >= Exporter.EXCEL_WRITE_ONLY_ROWS
+        
+        try:
+            workbook = Workbook(write_only=write_only)
+            if not write_only:
+                workbook.remove(workbook.active)    # sheets are created as their first row comes in
+            sheets = {}     # title -> (sheet, reusable typed cells or None)
             
-            sheet.append(["id", "type", "amount", "category", "date", "description"])
+            rows_written = 0
+            for row_data in records:
+                title = Exporter._month_sheet_title(row_data['date']) if split_by_month else "Transactions"
+                if title not in sheets:
+                    sheets[title] = Exporter._new_excel_sheet(workbook, title, write_only)
+                sheet, cells = sheets[title]
+                
+                row = [row_data['id'], row_data['type'], row_data['amount'], row_data['category'], row_data['date'], row_data['description']]
+                if typed_columns:
+                    row[2] = Exporter._format_cell(sheet, cells, 2, float(row[2]), Exporter.EXCEL_AMOUNT_FORMAT)
+                    row[4] = Exporter._format_cell(sheet, cells, 4, Exporter._excel_date(row[4]), Exporter.EXCEL_DATE_FORMAT)
+                sheet.append(row)
+                rows_written += 1
             
-            for row_data in data:
-                sheet.append([row_data['id'], row_data['type'], row_data['amount'], row_data['category'], row_data['date'], row_data['description']])
+            # month sheets in calendar order, "Other" last
+            for position, title in enumerate(sorted(sheets, key=lambda title: (title == "Other", title))):
+                workbook.move_sheet(title, position - workbook.sheetnames.index(title))
                 
             # Save the workbook to an Excel file
-            workbook.save(filepath)
+            with Exporter._atomic_path(filepath) as tmp_path:
+                workbook.save(tmp_path)
         
-            print_success(f"Exported {len(data)} records to Excel: {filepath}")
+            print_success(f"Exported {rows_written} records to Excel: {filepath}")
             return True
         except Exception as e:
             print_error(f"Excel export failed: {e}")
             return False
     
     
-    # pdf export
+    # pdf export from any iterable: income and expense sections, each split into page-sized tables that
+    # share one TableStyle (row-background cycling and column-wide amount colours instead of per-row commands)
     @staticmethod
-    def export_pdf(data: list, filename: str):
-        
-        if not Exporter._validate_data(data, filename):
+    def export_pdf(data, filename: str):
+        records = Exporter._iter_records(data, filename)
+        if records is None:
             return False
         
-        downloads_path = Exporter.get_downloads_path()
-        filepath = os.path.join(downloads_path, filename)
-        os.makedirs(os.path.dirname(filepath), exist_ok=True)   
+        filepath = Exporter._output_path(filename)
         
         try:
             # creating document contaier and layout
@@ -204,16 +309,10 @@ class Exporter:
             title = Paragraph(f"Transaction Report - {current_date.strftime('%B %Y')}", title_style)
             content.append(title)
             
-            # Group data by type
-            income_data = [row for row in data if row['type'].lower() == 'income']
-            expense_data = [row for row in data if row['type'].lower() == 'expense']
-            
-            # Sort each group by date
-            income_data = sorted(income_data, key=lambda x: x['date'])
-            expense_data = sorted(expense_data, key=lambda x: x['date'])
-            
-            total_income = 0
-            total_expenses = 0
+            # Group data by type as compact (date, description, category, amount) rows, totals on the way
+            rows_by_type, totals, rows_written = Exporter._pdf_rows(records)
+            total_income = totals['income']
+            total_expenses = totals['expense']
             
             # Section header style
             section_style = styles['Heading2'].clone('SectionHeader')
@@ -227,38 +326,9 @@ class Exporter:
             table_headers = ['Date', 'Description', 'Category', 'Amount']
             col_widths = [1*inch, 3*inch, 1.5*inch, 1.3*inch]  
             
-            # Helper function to create styled table
-            def create_transaction_table(transaction_data, transaction_type):
-                if not transaction_data:
-                    return None
-                
-                table_data = [table_headers]
-                
-                # creating table and total of type(income/expense)
-                for row in transaction_data:
-                    processed_description = Exporter.smart_description_handler(row['description'])
-                    amount_val = float(str(row['amount']).replace(',', ''))
-                    
-                    if transaction_type == 'income':
-                        nonlocal total_income
-                        total_income += amount_val
-                    else:
-                        nonlocal total_expenses
-                        total_expenses += amount_val
-                    
-                    formatted_amount = f"{amount_val:,.2f}"
-                    
-                    table_data.append([
-                        row['date'],
-                        processed_description,
-                        row['category'],
-                        formatted_amount
-                    ])
-                
-                table = Table(table_data, colWidths=col_widths, repeatRows=1)
-                
-                # Base table style
-                table_style = [
+            # one style for every table of a type: a fixed number of commands whatever the row count
+            def create_table_style(amount_color):
+                return TableStyle([
                     # Header styling
                     ('BACKGROUND', (0, 0), (-1, 0), header_color),
                     ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
@@ -286,58 +356,44 @@ class Exporter:
                     # Grid
                     ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#CCCCCC')),
                     ('LINEBELOW', (0, 0), (-1, 0), 2, header_color),
-                ]
-                
-                # Add zebra striping and amount coloring
-                for i in range(1, len(table_data)):
-                    if i % 2 == 0:  # Zebra striping
-                        table_style.append(('BACKGROUND', (0, i), (-1, i), alt_row_color))
                     
-                    # Color-code amounts
-                    if transaction_type == 'income':
-                        table_style.extend([
-                            ('TEXTCOLOR', (3, i), (3, i), income_color),
-                            ('FONTNAME', (3, i), (3, i), 'Helvetica-Bold')
-                        ])
-                    else:
-                        table_style.extend([
-                            ('TEXTCOLOR', (3, i), (3, i), expense_color),
-                            ('FONTNAME', (3, i), (3, i), 'Helvetica-Bold')
-                        ])
-                
-                table.setStyle(TableStyle(table_style))
-                return table
+                    # Zebra striping and amount coloring
+                    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, alt_row_color]),
+                    ('TEXTCOLOR', (3, 1), (3, -1), amount_color),
+                    ('FONTNAME', (3, 1), (3, -1), 'Helvetica-Bold'),
+                ])
+            
+            # page-sized tables (header repeated on each), built as the layout reaches them, so layout
+            # time stays linear, long sections paginate and only a few tables exist at a time
+            def create_transaction_table(transaction_rows, amount_color):
+                return ChunkedTable(table_headers, transaction_rows, Exporter.PDF_TABLE_ROWS, col_widths, create_table_style(amount_color))
             
             # helper function completes 
             
             
             # Add Income section
-            if income_data:
+            if rows_by_type['income']:
                 # Income section header
                 income_header_style = section_style.clone('IncomeHeader')
                 income_header_style.textColor = income_color
                 income_header = Paragraph("INCOME TRANSACTIONS", income_header_style)
                 content.append(income_header)
                 
-                # Income table
-                income_table = create_transaction_table(income_data, 'income')
-                if income_table:
-                    content.append(KeepTogether(income_table))
+                # Income tables
+                content.append(create_transaction_table(rows_by_type.pop('income'), income_color))
                 
                 content.append(Spacer(1, 20))
             
             # Add Expense section
-            if expense_data:
+            if rows_by_type['expense']:
                 # Expense section header
                 expense_header_style = section_style.clone('ExpenseHeader')
                 expense_header_style.textColor = expense_color
                 expense_header = Paragraph("EXPENSE TRANSACTIONS", expense_header_style)
                 content.append(expense_header)
                 
-                # Expense table
-                expense_table = create_transaction_table(expense_data, 'expense')
-                if expense_table:
-                    content.append((expense_table))
+                # Expense tables
+                content.append(create_transaction_table(rows_by_type.pop('expense'), expense_color))
                 
                 content.append(Spacer(1, 30))
             
@@ -387,8 +443,10 @@ class Exporter:
             content.append(summary_table)
             
             # creates document
-            doc.build(content)
-            print_success(f"Exported {len(data)} records to PDF: {filepath}")
+            with Exporter._atomic_path(filepath) as tmp_path:
+                doc.filename = tmp_path
+                doc.build(content)
+            print_success(f"Exported {rows_written} records to PDF: {filepath}")
             return True
             
         except Exception as e:
@@ -398,6 +456,74 @@ class Exporter:
     
     # ================================ Helper methods ================================ #
     
+    # ({type: [(date, description, category, amount)] sorted by date}, {type: total}, row count) for the pdf;
+    # each distinct description goes through smart_description_handler once
+    @staticmethod
+    def _pdf_rows(records):
+        rows_by_type = {'income': [], 'expense': []}
+        totals = {'income': 0, 'expense': 0}
+        descriptions = {}
+        rows_written = 0
+        
+        for row in records:
+            rows_written += 1
+            transaction_type = row['type'].lower()
+            if transaction_type not in rows_by_type:
+                continue
+            
+            description = row['description']
+            processed_description = descriptions.get(description)
+            if processed_description is None:
+                processed_description = descriptions[description] = Exporter.smart_description_handler(description)
+            
+            amount_val = float(str(row['amount']).replace(',', ''))
+            totals[transaction_type] += amount_val
+            rows_by_type[transaction_type].append((row['date'], processed_description, row['category'], f"{amount_val:,.2f}"))
+        
+        for transaction_rows in rows_by_type.values():
+            transaction_rows.sort(key=lambda row: row[0])
+        return rows_by_type, totals, rows_written
+    
+    
+    # sheet with the header row and column widths (write-only sheets only accept widths before any row)
+    @staticmethod
+    def _new_excel_sheet(workbook, title, write_only):
+        sheet = workbook.create_sheet(title)
+        for column, width in Exporter.EXCEL_COLUMN_WIDTHS.items():
+            sheet.column_dimensions[column].width = width
+        sheet.append(Exporter.FIELDNAMES)
+        return sheet, {} if write_only else None
+    
+    
+    # value as a cell with a number format. A write-only sheet serializes each row as soon as it is
+    # appended, so it reuses one cell per column (cells is a dict); a regular sheet needs a new cell each row
+    @staticmethod
+    def _format_cell(sheet, cells, column, value, number_format):
+        cell = cells.get(column) if cells is not None else None
+        if cell is None:
+            cell = WriteOnlyCell(sheet)
+            cell.number_format = number_format
+            if cells is not None:
+                cells[column] = cell
+        cell.value = value
+        return cell
+    
+    
+    # "YYYY-MM-DD" as a date, anything else stays text
+    @staticmethod
+    def _excel_date(value):
+        try:
+            return date.fromisoformat(value)
+        except (TypeError, ValueError):
+            return value
+    
+    
+    @staticmethod
+    def _month_sheet_title(value):
+        month = str(value)[:7]
+        return month if MONTH.fullmatch(month) else "Other"
+    
+    
     # handling description length
     @staticmethod
     def smart_description_handler(description, max_chars=60):
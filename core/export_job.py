@@ -0,0 +1,88 @@
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stdout
+
+from core.export import Exporter
+
+# exporter method for each format of an export job
+EXPORTERS = {
+    "csv": "export_csv",
+    "xlsx": "export_excel",
+    "pdf": "export_pdf",
+    "json": "export_json",
+    "ndjson": "export_ndjson",
+}
+
+
+class ExportResult:
+    """Outcome of one format of an export job."""
+
+    def __init__(self, extension, filename, ok, seconds, output=""):
+        self.extension = extension
+        self.filename = filename
+        self.filepath = os.path.join(Exporter.get_downloads_path(), filename)
+        self.ok = ok
+        self.seconds = seconds
+        self.output = output        # what the exporter printed (its success or error message)
+
+
+class ExportJob:
+    """
+    Writes one filtered set of txns in several formats at once. The records are packed once into
+    tuples and every format runs in its own worker process, since the Excel and PDF writers are
+    pure-python and would only take turns on the GIL in threads. Each exporter writes to a temp
+    file and renames it, so a failed format never leaves a partial file in the exports directory.
+    """
+
+    FORMATS = ("csv", "xlsx", "pdf", "json")
+
+    def __init__(self, formats=FORMATS, max_workers=None):
+        unknown = [extension for extension in formats if extension not in EXPORTERS]
+        if unknown:
+            raise ValueError(f"Unknown export format: {', '.join(unknown)}")
+        self.formats = tuple(formats)
+        self.max_workers = max_workers or min(len(self.formats), os.cpu_count() or 1)
+
+
+    # export records (dicts or txns) to filename_for(extension) in every format; progress(result) is
+    # called as each format finishes. Returns the ExportResults in the order of self.formats
+    def run(self, records, filename_for, progress=None):
+        rows = [self._pack(record) for record in records]
+        results = {}
+
+        with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {
+                pool.submit(export_format, extension, rows, filename_for(extension)): extension
+                for extension in self.formats
+            }
+            for future in as_completed(futures):
+                extension = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:      # the worker itself died (exporters catch their own errors)
+                    result = ExportResult(extension, filename_for(extension), False, 0.0, str(e))
+                results[extension] = result
+                if progress:
+                    progress(result)
+
+        return [results[extension] for extension in self.formats]
+
+
+    @staticmethod
+    def _pack(record):
+        if not isinstance(record, dict):
+            record = record.to_dict()
+        return tuple(record[field] for field in Exporter.FIELDNAMES)
+
+
+# runs in a worker process: one format of an export job, with the exporter's messages captured
+def export_format(extension, rows, filename):
+    output = io.StringIO()
+    start = time.perf_counter()
+    with redirect_stdout(output):
+        ok = getattr(Exporter, EXPORTERS[extension])(
+            (dict(zip(Exporter.FIELDNAMES, row)) for row in rows), filename
+        )
+    return ExportResult(extension, filename, ok, time.perf_counter() - start, output.getvalue().strip())
@@ -0,0 +1,360 @@
+import csv
+import json
+import time
+import unicodedata
+from datetime import datetime
+from itertools import islice
+from bisect import bisect_right
+from pathlib import Path
+
+from core.transaction import Transaction
+from core.indexes import fingerprint, near_fingerprint
+from utils.json_io import iter_json_records
+from utils.validation import parse_amount, parse_type, parse_date, parse_category, parse_description
+
+
+# header names (compared lower-case) accepted for each field of a statement csv
+COLUMN_ALIASES = {
+    "id": ("id",),
+    "type": ("type", "transaction type", "dr/cr", "cr/dr"),
+    "amount": ("amount", "transaction amount"),
+    "debit": ("debit", "withdrawal", "withdrawal amt.", "money out", "paid out"),
+    "credit": ("credit", "deposit", "deposit amt.", "money in", "paid in"),
+    "category": ("category",),
+    "date": ("date", "transaction date", "txn date", "posting date", "posted date", "value date"),
+    "description": ("description", "narration", "details", "memo", "payee", "particulars"),
+}
+
+TYPE_ALIASES = {"dr": "expense", "debit": "expense", "cr": "income", "credit": "income"}
+
+DUPLICATE_MODES = ("skip", "merge", "tag", "allow")
+DUPLICATE_TAG = "[possible duplicate]"
+
+
+class ImportReport:
+    """Counts and timing of one import, plus the first few rejected rows and why."""
+
+    MAX_SAMPLES = 20
+
+    def __init__(self):
+        self.rows = 0
+        self.imported = 0
+        self.skipped = 0                # id already in the ledger
+        self.duplicates = 0             # exact duplicates of a txn already in the ledger, not added
+        self.near_duplicates = 0        # added, but the ledger has a txn with the same date, amount and type
+        self.merged = 0                 # folded into the ledger txn they duplicate
+        self.tagged = 0                 # added with DUPLICATE_TAG in the description
+        self.rejected = 0
+        self.rejected_samples = []      # (row number, reason)
+        self.seconds = 0.0
+
+
+    @property
+    def rows_per_sec(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+    def reject(self, row_number, reason):
+        self.rejected += 1
+        if len(self.rejected_samples) < self.MAX_SAMPLES:
+            self.rejected_samples.append((row_number, reason))
+
+
+class TransactionImporter:
+    """
+    Streams rows from a bank statement csv, a csv/json/ndjson export of this app or a transactions json
+    snapshot, validates them with the rules of utils.validation (no prompts), maps categories and adds
+    the valid ones to the manager inside one batch, so they are indexed and saved once (and nothing is
+    saved if the import fails). Rows are read lazily, chunk_size at a time between progress callbacks.
+
+    Rows that duplicate a txn the ledger had before the import (see ExpenseManager.find_duplicates) are
+    handled by the duplicates mode: "skip" drops exact duplicates and counts near ones, "merge" fills the
+    missing description/category of the ledger txn instead of adding the row, "tag" adds the row with
+    DUPLICATE_TAG in its description and "allow" adds everything. A file that repeats a row is taken at
+    its word: only as many copies as the ledger already holds count as duplicates.
+    """
+
+    CHUNK_SIZE = 5_000
+
+    def __init__(self, manager, categories=None, category_map=None, default_category="Other",
+                 date_format="%Y-%m-%d", chunk_size=CHUNK_SIZE, duplicates="skip"):
+        if duplicates not in DUPLICATE_MODES:
+            raise ValueError(f"duplicates must be one of: {', '.join(DUPLICATE_MODES)}")
+        self.manager = manager
+        self.categories = categories                    # {"income": [...], "expense": [...]}, None accepts any
+        self.category_map = {source.strip().lower(): target for source, target in (category_map or {}).items()}
+        self.default_category = default_category        # used for unknown categories, None rejects those rows
+        self.date_format = date_format                  # format of the file's dates, stored as YYYY-MM-DD
+        self.chunk_size = chunk_size
+        self.duplicates = duplicates
+        self._seen = {}                                 # hash of a fingerprint the ledger had before -> rows with it
+        self._added_runs = []                           # [first, last] seqs of the txns this import added
+        self._known = {                                 # case-insensitive lookup of the user's categories
+            type_: {name.lower(): name for name in names} for type_, names in (categories or {}).items()
+        }
+
+
+    # import every row of a .csv or .json file; rejected rows are also written to rejects_path (csv) if given
+    def import_file(self, filepath, rejects_path=None, progress=None):
+        report = ImportReport()
+        self._seen.clear()
+        self._added_runs.clear()
+        start = time.perf_counter()
+        rows = self._read_rows(filepath)
+
+        rejects_file = open(rejects_path, 'w', newline='', encoding='utf-8') if rejects_path else None
+        rejects = csv.writer(rejects_file) if rejects_file else None
+        if rejects:
+            rejects.writerow(["row", "reason", "data"])
+
+        try:
+            with self.manager.batch():
+                while True:
+                    chunk = list(islice(rows, self.chunk_size))
+                    if not chunk:
+                        break
+                    for row_number, row in chunk:
+                        self._import_row(row_number, row, report, rejects)
+                    if progress:
+                        report.seconds = time.perf_counter() - start
+                        progress(report)
+        finally:
+            if rejects_file:
+                rejects_file.close()
+
+        report.seconds = time.perf_counter() - start
+        return report
+
+
+    def _import_row(self, row_number, row, report, rejects):
+        report.rows += 1
+        try:
+            transaction = self.parse_row(row)
+        except ValueError as e:
+            report.reject(row_number, str(e))
+            if rejects:
+                rejects.writerow([row_number, str(e), json.dumps(row, default=str)])
+            return
+
+        if self.manager.has_transaction(transaction.id):
+            report.skipped += 1
+            return
+        if self.duplicates != "allow" and not self._handle_duplicate(transaction, report):
+            return
+
+        if self.manager.add_transaction(transaction):
+            report.imported += 1
+            self._note_added(transaction.seq)
+        else:
+            report.skipped += 1
+
+
+    # apply the duplicates mode to a row; returns whether it should still be added
+    def _handle_duplicate(self, transaction, report):
+        exact, near = self.manager.find_duplicates(transaction)
+
+        # matches the ledger had before this import: rows added by it don't count against later rows
+        exact = [txn_id for txn_id in exact if not self._added_by_import(txn_id)]
+        near = [txn_id for txn_id in near if not self._added_by_import(txn_id)]
+        seen_exact = self._see(fingerprint(transaction)) if exact else 0
+        seen_near = self._see(near_fingerprint(transaction)) if exact or near else 0
+        is_exact = 0 < seen_exact <= len(exact)
+        is_near = not is_exact and 0 < seen_near <= len(exact) + len(near)
+        if not is_exact and not is_near:
+            return True
+
+        if self.duplicates == "tag":
+            transaction.description = f"{transaction.description} {DUPLICATE_TAG}" if transaction.description else DUPLICATE_TAG
+            report.tagged += 1
+            return True
+
+        if is_exact:
+            report.duplicates += 1
+            return False
+
+        if self.duplicates == "merge":
+            self._merge(near[0], transaction)
+            report.merged += 1
+            return False
+
+        report.near_duplicates += 1
+        return True
+
+
+    # count one more row with a key the ledger already had; only those keys are kept (by hash), so
+    # importing new rows keeps no per-row state
+    def _see(self, key):
+        key = hash(key)
+        self._seen[key] = self._seen.get(key, 0) + 1
+        return self._seen[key]
+
+
+    # seqs of added txns are consecutive until a page-in takes some, so a few runs cover them all
+    def _note_added(self, seq):
+        if self._added_runs and self._added_runs[-1][1] == seq - 1:
+            self._added_runs[-1][1] = seq
+        else:
+            self._added_runs.append([seq, seq])
+
+
+    def _added_by_import(self, txn_id):
+        seq = self.manager.transactions[txn_id].seq
+        position = bisect_right(self._added_runs, seq, key=lambda run: run[0]) - 1
+        return position >= 0 and seq <= self._added_runs[position][1]
+
+
+    # fill what the ledger txn lacks (description, a default category) from its duplicate row
+    def _merge(self, txn_id, transaction):
+        existing = self.manager.transactions[txn_id]
+        fields = {}
+        if not existing.description and transaction.description:
+            fields["description"] = transaction.description
+        if existing.category == self.default_category and transaction.category != self.default_category:
+            fields["category"] = transaction.category
+        if fields:
+            self.manager.update_transaction(txn_id, fields)
+
+
+    # Transaction from a row keyed by our field names (see COLUMN_ALIASES); raises ValueError when invalid
+    def parse_row(self, row):
+        if not isinstance(row, dict):
+            raise ValueError("Row is not a json object of transaction fields.")
+        type_, amount = self._type_and_amount(row)
+        return Transaction(
+            type=type_,
+            amount=amount,
+            category=self._category(type_, row.get("category")),
+            date=self._date(row.get("date")),
+            id=self._blank_to_none(row.get("id")),
+            description=parse_description(row.get("description")),
+        )
+
+
+    # type column + positive amount, a signed amount (negative = expense) or separate debit/credit columns
+    def _type_and_amount(self, row):
+        raw_type = self._blank_to_none(row.get("type"))
+        raw_amount = self._blank_to_none(row.get("amount"))
+
+        if raw_amount is None:
+            debit = self._blank_to_none(row.get("debit"))
+            credit = self._blank_to_none(row.get("credit"))
+            if debit is not None:
+                return "expense", parse_amount(self._clean_number(debit))
+            if credit is not None:
+                return "income", parse_amount(self._clean_number(credit))
+            raise ValueError("Amount is missing.")
+
+        value = self._clean_number(raw_amount)
+        if raw_type is not None:
+            return parse_type(TYPE_ALIASES.get(str(raw_type).strip().lower(), raw_type)), parse_amount(value)
+
+        try:
+            signed = float(value)
+        except ValueError:
+            raise ValueError("Please enter a valid number.")
+        return ("expense" if signed < 0 else "income"), parse_amount(abs(signed))
+
+
+    def _category(self, type_, raw):
+        category = self._blank_to_none(raw)
+        if category is not None:
+            category = self.category_map.get(str(category).strip().lower(), str(category).strip())
+        elif self.default_category is not None:
+            category = self.default_category
+        else:
+            raise ValueError("Category is missing.")
+
+        if self.categories is None:
+            return category
+
+        category = self._known.get(type_, {}).get(category.lower(), category)
+        if category not in self.categories.get(type_, []) and self.default_category is not None:
+            category = self.default_category
+        return parse_category(category, self.categories.get(type_, []))
+
+
+    def _date(self, raw):
+        if self._blank_to_none(raw) is None:
+            raise ValueError("Date is missing.")
+        if self.date_format != "%Y-%m-%d":
+            try:
+                raw = datetime.strptime(str(raw).strip(), self.date_format).strftime("%Y-%m-%d")
+            except ValueError:
+                raise ValueError(f"Date must be in {self.date_format} format.")
+        return parse_date(raw)
+
+
+    # (row number, row keyed by our field names) from a csv, json or ndjson file
+    def _read_rows(self, filepath):
+        suffix = Path(filepath).suffix.lower()
+        if suffix == ".json":
+            return enumerate(iter_json_records(filepath), start=1)
+        if suffix in (".ndjson", ".jsonl"):
+            return self._read_ndjson(filepath)
+        return self._read_csv(filepath)
+
+
+    @staticmethod
+    def _read_ndjson(filepath):
+        with open(filepath, 'r', encoding='utf-8-sig') as file:
+            for line_number, line in enumerate(file, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError:
+                    row = line.strip()      # not json: rejected by parse_row like any other non-object
+                yield line_number, row
+
+
+    def _read_csv(self, filepath):
+        with open(filepath, 'r', newline='', encoding='utf-8-sig') as file:
+            reader = csv.reader(file)
+            header = next(reader, None)
+            if header is None:
+                return
+            columns = self._map_columns(header)
+            for values in reader:
+                if not any(value.strip() for value in values):
+                    continue    # blank line
+                yield reader.line_num, {field: values[index] for field, index in columns.items() if index < len(values)}
+
+
+    # {field: column index} for the csv header
+    @staticmethod
+    def _map_columns(header):
+        names = [name.strip().lower() for name in header]
+        columns = {}
+        for field, aliases in COLUMN_ALIASES.items():
+            for alias in aliases:
+                if alias in names:
+                    columns[field] = names.index(alias)
+                    break
+        return columns
+
+
+    # "1,234.50", "₹ 99", "(12.00)" -> "1234.50", "99", "-12.00"; text float() reads as it is
+    # ("1.5E+03") is kept, and anything left that is not a number is rejected by parse_amount
+    @staticmethod
+    def _clean_number(value):
+        if isinstance(value, (int, float)):
+            return value
+        text = str(value).strip()
+        try:
+            float(text)
+            return text
+        except ValueError:
+            pass
+
+        text = "".join(char for char in text
+                       if not (char.isspace() or char in ",'" or unicodedata.category(char) == "Sc"))
+        if text.startswith("(") and text.endswith(")"):
+            text = "-" + text[1:-1]
+        return text
+
+
+    @staticmethod
+    def _blank_to_none(value):
+        if value is None or (isinstance(value, str) and not value.strip()):
+            return None
+        return value
@@ -0,0 +1,486 @@
+import re
+from bisect import bisect_left, insort
+from datetime import date, datetime
+from collections import defaultdict
+
+ISO_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+MONTH_PREFIX = re.compile(r"(\d{4})(?:-(\d{2}))?")
+NON_WORD = re.compile(r"[\W_]+")
+
+
+# "YYYY-MM-DD" -> date ordinal, None for dates that cannot be parsed
+def date_to_ordinal(date_str):
+    try:
+        return date.fromisoformat(date_str).toordinal()
+    except (TypeError, ValueError):
+        pass
+    try:
+        # non zero-padded dates like 2025-7-1 still pass validate_date
+        return datetime.strptime(date_str, "%Y-%m-%d").toordinal()
+    except (TypeError, ValueError):
+        return None
+
+
+# ordinal of a zero-padded "YYYY-MM-DD" string, None for anything else
+def iso_ordinal(date_str):
+    if not isinstance(date_str, str) or not ISO_DATE.fullmatch(date_str):
+        return None
+    try:
+        return date.fromisoformat(date_str).toordinal()
+    except ValueError:
+        return None
+
+
+# [first, last] ordinals covered by a "YYYY" or "YYYY-MM" prefix, None for other prefixes
+def month_bounds(month):
+    match = MONTH_PREFIX.fullmatch(month) if isinstance(month, str) else None
+    if not match:
+        return None
+
+    year = int(match.group(1))
+    if match.group(2) is None:
+        first, after = date(year, 1, 1), date(year + 1, 1, 1)
+    else:
+        month_num = int(match.group(2))
+        if not 1 <= month_num <= 12:
+            return None
+        first = date(year, month_num, 1)
+        after = date(year + 1, 1, 1) if month_num == 12 else date(year, month_num + 1, 1)
+    return first.toordinal(), after.toordinal() - 1
+
+
+# date ordinal of a txn, parsing only dates that are not stored as an ordinal already
+def txn_ordinal(txn):
+    if txn.date_ordinal is not None:
+        return txn.date_ordinal
+    return date_to_ordinal(txn.date)
+
+
+# [first, last] ordinals selected by the date criteria of filter_by_criteria, None when there is no
+# date criterion or it cannot be expressed as an ordinal range
+def criteria_bounds(date=None, from_date=None, to_date=None, month=None):
+    if date:
+        ordinal = iso_ordinal(date)
+        return None if ordinal is None else (ordinal, ordinal)
+    elif from_date and to_date:
+        return datetime.strptime(from_date, "%Y-%m-%d").toordinal(), datetime.strptime(to_date, "%Y-%m-%d").toordinal()
+    elif month:
+        return month_bounds(month)
+    return None
+
+
+# signed contribution of a txn to the running balance, in minor units
+def net_minor(txn):
+    if txn.type == "income":
+        return txn.amount_minor
+    elif txn.type == "expense":
+        return -txn.amount_minor
+    return 0
+
+
+class BalanceIndex:
+    """
+    Cumulative net balance by day, kept in a Fenwick tree over date ordinals.
+    Adding/removing a txn and asking for the balance before a date are both O(log days).
+    Sums are kept in integer minor units so they never drift.
+    """
+
+    # extra days allocated on each side when the tree has to grow
+    GROWTH_SLACK = 366
+
+    def __init__(self):
+        self.daily = defaultdict(int)       # ordinal -> net minor units of that day
+        self.base = 0
+        self.tree = [0]
+
+
+    # rebuild from scratch for a dict of txns
+    def rebuild(self, transactions):
+        self.daily = defaultdict(int)
+        for txn in transactions.values():
+            ordinal = txn_ordinal(txn)
+            if ordinal is not None:
+                self.daily[ordinal] += net_minor(txn)
+        self._resize()
+
+
+    def add(self, txn):
+        self._update(txn_ordinal(txn), net_minor(txn))
+
+
+    def remove(self, txn):
+        self._update(txn_ordinal(txn), -net_minor(txn))
+
+
+    # net balance of every txn dated strictly before the given ordinal
+    def balance_before(self, ordinal):
+        position = min(ordinal - self.base, len(self.tree) - 1)
+        total = 0
+        while position > 0:
+            total += self.tree[position]
+            position -= position & -position
+        return total / 100
+
+
+    def _update(self, ordinal, delta):
+        if ordinal is None or delta == 0:
+            return
+
+        self.daily[ordinal] += delta
+        if not self.base <= ordinal < self.base + len(self.tree) - 1:
+            self._resize()
+            return
+
+        position = ordinal - self.base + 1
+        while position < len(self.tree):
+            self.tree[position] += delta
+            position += position & -position
+
+
+    # reallocate the tree so it covers every known day (plus slack) and refill it in O(days)
+    def _resize(self):
+        if not self.daily:
+            self.base, self.tree = 0, [0]
+            return
+
+        self.base = min(self.daily) - self.GROWTH_SLACK
+        size = max(self.daily) + self.GROWTH_SLACK - self.base + 1
+        tree = [0] * (size + 1)
+        for ordinal, amount in self.daily.items():
+            tree[ordinal - self.base + 1] += amount
+
+        for position in range(1, size + 1):
+            parent = position + (position & -position)
+            if parent <= size:
+                tree[parent] += tree[position]
+        self.tree = tree
+
+
+class DateIndex:
+    """
+    Txn ids sorted by date ordinal so exact-day, month and range lookups are
+    a bisect plus the matching slice: O(log n + k).
+    """
+
+    def __init__(self):
+        self.keys = []          # sorted (ordinal, txn_id)
+        self.irregular = {}     # txn_id -> date string that is not zero-padded ISO
+
+
+    # rebuild from scratch for a dict of txns
+    def rebuild(self, transactions):
+        self.keys = []
+        self.irregular = {}
+        for txn_id, txn in transactions.items():
+            ordinal = txn.date_ordinal
+            if ordinal is None:
+                self.irregular[txn_id] = txn.date
+            else:
+                self.keys.append((ordinal, txn_id))
+        self.keys.sort()
+
+
+    def add(self, txn):
+        ordinal = txn.date_ordinal
+        if ordinal is None:
+            self.irregular[txn.id] = txn.date
+        else:
+            insort(self.keys, (ordinal, txn.id))
+
+
+    def remove(self, txn):
+        ordinal = txn.date_ordinal
+        if ordinal is None:
+            self.irregular.pop(txn.id, None)
+            return
+
+        position = bisect_left(self.keys, (ordinal, txn.id))
+        if position < len(self.keys) and self.keys[position] == (ordinal, txn.id):
+            del self.keys[position]
+
+
+    # ids for the date criteria of filter_by_criteria (date > range > month), None when there is none
+    def lookup(self, date=None, from_date=None, to_date=None, month=None):
+        if date:
+            return self.ids_on(date)
+        elif from_date and to_date:
+            return self.ids_between(from_date, to_date)
+        elif month:
+            return self.ids_in_month(month)
+        return None
+
+
+    # ids of txns whose date string equals date_str
+    def ids_on(self, date_str):
+        ordinal = iso_ordinal(date_str)
+        matches = [] if ordinal is None else self._slice(ordinal, ordinal)
+        return matches + [txn_id for txn_id, raw in self.irregular.items() if raw == date_str]
+
+
+    # ids of txns whose date string starts with month
+    def ids_in_month(self, month):
+        bounds = month_bounds(month)
+        if bounds is None:
+            # unusual prefix (e.g. "2025-1"), fall back to matching the raw strings
+            return [txn_id for ordinal, txn_id in self.keys if date.fromordinal(ordinal).isoformat().startswith(month)] + \
+                   [txn_id for txn_id, raw in self.irregular.items() if raw.startswith(month)]
+
+        return self._slice(*bounds) + [txn_id for txn_id, raw in self.irregular.items() if raw.startswith(month)]
+
+
+    # ids of txns dated from_date..to_date inclusive
+    def ids_between(self, from_date, to_date):
+        start = datetime.strptime(from_date, "%Y-%m-%d").toordinal()
+        end = datetime.strptime(to_date, "%Y-%m-%d").toordinal()
+
+        matches = self._slice(start, end)
+        for txn_id, raw in self.irregular.items():
+            ordinal = date_to_ordinal(raw)
+            if ordinal is not None and start <= ordinal <= end:
+                matches.append(txn_id)
+        return matches
+
+
+    # number of ids lookup() would return, from two bisects (no slicing)
+    def count(self, date=None, from_date=None, to_date=None, month=None):
+        bounds = criteria_bounds(date=date, from_date=from_date, to_date=to_date, month=month)
+        if bounds is None:
+            return len(self.keys) + len(self.irregular)
+        low = bisect_left(self.keys, (bounds[0],))
+        high = bisect_left(self.keys, (bounds[1] + 1,))
+        return max(high - low, 0) + len(self.irregular)
+
+
+    def _slice(self, first, last):
+        low = bisect_left(self.keys, (first,))
+        high = bisect_left(self.keys, (last + 1,))
+        return [txn_id for _, txn_id in self.keys[low:high]]
+
+
+class PostingIndex:
+    """
+    Inverted index: type -> ids and category -> ids, plus running totals (minor units) per (type, category).
+    Posting lists are insertion-ordered dicts used as ordered sets, so results keep ledger order.
+    """
+
+    def __init__(self):
+        self.by_type = defaultdict(dict)
+        self.by_category = defaultdict(dict)
+        self.totals = {}        # (type, category) -> [amount in minor units, count]
+
+
+    # rebuild from scratch for a dict of txns
+    def rebuild(self, transactions):
+        self.by_type = defaultdict(dict)
+        self.by_category = defaultdict(dict)
+        self.totals = {}
+        for txn in transactions.values():
+            self.add(txn)
+
+
+    def add(self, txn):
+        self.by_type[txn.type][txn.id] = None
+        self.by_category[txn.category][txn.id] = None
+
+        total = self.totals.setdefault((txn.type, txn.category), [0, 0])
+        total[0] += txn.amount_minor
+        total[1] += 1
+
+
+    def remove(self, txn):
+        self._discard(self.by_type, txn.type, txn.id)
+        self._discard(self.by_category, txn.category, txn.id)
+
+        key = (txn.type, txn.category)
+        total = self.totals.get(key)
+        if total is not None:
+            total[0] -= txn.amount_minor
+            total[1] -= 1
+            if total[1] <= 0:
+                del self.totals[key]
+
+
+    def ids_of_type(self, type_):
+        return self.by_type.get(type_, {})
+
+
+    def ids_in_category(self, category):
+        return self.by_category.get(category, {})
+
+
+    # {category: total amount} for a type, straight from the running totals
+    def category_totals(self, type_):
+        return {category: total[0] / 100 for (txn_type, category), total in self.totals.items() if txn_type == type_}
+
+
+    @staticmethod
+    def _discard(postings, key, txn_id):
+        ids = postings.get(key)
+        if ids is None:
+            return
+        ids.pop(txn_id, None)
+        if not ids:
+            del postings[key]
+
+
+class Rollups:
+    """
+    Materialized per-day and per-month aggregates: (type, category) -> [amount in minor units, count].
+    Days are keyed by the txn's date string and months by its first 7 characters, which is exactly
+    what the exact-date and "YYYY-MM" month filters match on. Add/remove touch one group of each.
+    """
+
+    def __init__(self):
+        self.daily = {}
+        self.monthly = {}
+
+
+    # rebuild from scratch for a dict of txns
+    def rebuild(self, transactions):
+        self.daily = {}
+        self.monthly = {}
+        for txn in transactions.values():
+            self.add(txn)
+
+
+    def add(self, txn):
+        date_str = txn.date
+        self._apply(self.daily, date_str, txn, 1)
+        self._apply(self.monthly, date_str[:7], txn, 1)
+
+
+    def remove(self, txn):
+        date_str = txn.date
+        self._apply(self.daily, date_str, txn, -1)
+        self._apply(self.monthly, date_str[:7], txn, -1)
+
+
+    # (type, category, amount, count) groups of a day
+    def day_groups(self, date_str):
+        return self._groups(self.daily.get(date_str, {}))
+
+
+    # (type, category, amount, count) groups of a "YYYY-MM" month, None for any other prefix
+    def month_groups(self, month):
+        if len(month) != 7:
+            return None
+        return self._groups(self.monthly.get(month, {}))
+
+
+    @staticmethod
+    def _groups(bucket):
+        return [(type_, category, total[0] / 100, total[1]) for (type_, category), total in bucket.items()]
+
+
+    @staticmethod
+    def _apply(buckets, key, txn, sign):
+        bucket = buckets.setdefault(key, {})
+        group = (txn.type, txn.category)
+        total = bucket.setdefault(group, [0, 0])
+        total[0] += sign * txn.amount_minor
+        total[1] += sign
+
+        if total[1] <= 0:
+            del bucket[group]
+            if not bucket:
+                del buckets[key]
+
+
+# lower-case words of a description, so "AMAZON.IN  Order" and "amazon in order" compare equal
+def normalize_description(description):
+    if not description:
+        return ""
+    return " ".join(NON_WORD.split(description.lower())).strip()
+
+
+# content fingerprint of a txn: (date, amount in minor units, type, category, normalized description)
+def fingerprint(txn):
+    return (txn.date_ordinal if txn.date_ordinal is not None else txn._raw_date,
+            txn.amount_minor, txn.type, txn.category, normalize_description(txn.description))
+
+
+# looser key of the same txn: (date, amount in minor units, type)
+def near_fingerprint(txn):
+    return (txn.date_ordinal if txn.date_ordinal is not None else txn._raw_date, txn.amount_minor, txn.type)
+
+
+class FingerprintIndex:
+    """
+    Txn ids by content fingerprint, so duplicates of a txn are found with two dict lookups:
+    exact ones share date, amount, type, category and normalized description, near ones only
+    date, amount and type (same payment, different category or wording). Buckets are keyed by the
+    hash of a fingerprint and hold a single id (a list once several txns share it); candidates are
+    checked against their own fingerprint, so a hash collision never counts as a duplicate.
+    """
+
+    def __init__(self):
+        self.transactions = {}
+        self.exact = {}     # hash(fingerprint) -> txn_id, or [txn_id, ...] in insertion order
+        self.near = {}      # hash(near fingerprint) -> txn_id or [txn_id, ...]
+
+
+    # rebuild from scratch for the dict of txns the ids refer to
+    def rebuild(self, transactions):
+        self.transactions = transactions
+        self.exact = {}
+        self.near = {}
+        for txn in transactions.values():
+            self.add(txn)
+
+
+    def add(self, txn):
+        self._add(self.exact, hash(fingerprint(txn)), txn.id)
+        self._add(self.near, hash(near_fingerprint(txn)), txn.id)
+
+
+    def remove(self, txn):
+        self._discard(self.exact, hash(fingerprint(txn)), txn.id)
+        self._discard(self.near, hash(near_fingerprint(txn)), txn.id)
+
+
+    # ids of other txns with the same fingerprint as txn
+    def exact_matches(self, txn):
+        return [txn_id for txn_id in self.ids(fingerprint(txn)) if txn_id != txn.id]
+
+
+    # ids of other txns with the same date, amount and type as txn but not its exact fingerprint
+    def near_matches(self, txn):
+        key = fingerprint(txn)
+        return [txn_id for txn_id in self.ids(near_fingerprint(txn), near=True)
+                if txn_id != txn.id and fingerprint(self.transactions[txn_id]) != key]
+
+
+    # ids of the txns that have this (exact or near) key
+    def ids(self, key, near=False):
+        ids = (self.near if near else self.exact).get(hash(key))
+        if ids is None:
+            return []
+        key_of = near_fingerprint if near else fingerprint
+        return [txn_id for txn_id in (ids if isinstance(ids, list) else [ids]) if key_of(self.transactions[txn_id]) == key]
+
+
+    # how many txns have this (exact or near) key
+    def count(self, key, near=False):
+        return len(self.ids(key, near))
+
+
+    @staticmethod
+    def _add(buckets, key, txn_id):
+        ids = buckets.get(key)
+        if ids is None:
+            buckets[key] = txn_id
+        elif isinstance(ids, list):
+            ids.append(txn_id)
+        else:
+            buckets[key] = [ids, txn_id]
+
+
+    @staticmethod
+    def _discard(buckets, key, txn_id):
+        ids = buckets.get(key)
+        if ids == txn_id:
+            del buckets[key]
+        elif isinstance(ids, list) and txn_id in ids:
+            ids.remove(txn_id)
+            if len(ids) == 1:
+                buckets[key] = ids[0]
@@ -1,30 +1,247 @@
 from core.transaction import Transaction
-from utils.json_io import load_data, save_data
-from utils.filtering import filter_by_criteria
-from datetime import datetime,date
+from core.storage import JsonStorage
+from core.indexes import BalanceIndex, DateIndex, PostingIndex, Rollups, FingerprintIndex, criteria_bounds
+from core.dashboard import DashboardSnapshot
+from core.batch import MutationBatch
+from core.changelog import ChangeLog
+from utils.filtering import filter_by_criteria, TransactionView, TransactionQuery
+from utils.cache import QueryCache, normalize_criteria
+from datetime import datetime, date
 from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
 
 
 class ExpenseManager:
-    def __init__(self, filepath):
+    def __init__(self, filepath, use_journal=True, storage=None, load_since=None, track_changes=True):
         self.transactions = {}
         self.filepath = filepath
+        self.load_since = load_since    # "YYYY-MM-DD": only load txns from here on, older ones are paged in on demand
+        self.storage = storage if storage is not None else JsonStorage(filepath, use_journal)
+        self.version = 0                # bumped on every load and mutation, used to invalidate cached results
+        self._dashboard = None
+        self.query_cache = QueryCache(maxsize=128)
+        self.balance_index = BalanceIndex()
+        self.date_index = DateIndex()
+        self.posting_index = PostingIndex()
+        self.rollups = Rollups()
+        self.fingerprints = FingerprintIndex()     # kept current even inside a batch, for duplicate checks
+        self._batch = None              # MutationBatch while inside batch()
+        self._next_seq = 0              # ledger position of the next txn put into self.transactions
+        # ids of persisted changes in order, for delta exports (data/transactions_<uid>.changes)
+        self.changelog = ChangeLog(Path(filepath).with_suffix(".changes")) if track_changes and filepath else None
         self.load_transactions()
 
 
-    # load all transactions of user 
+    # load all transactions of user (or the load_since window of them)
     def load_transactions(self):
-        raw_data = load_data(self.filepath)     # from utils
-        self.transactions = {txn_id : Transaction.from_dict(data) for txn_id, data in raw_data.items()}
+        self.transactions = self.storage.load(since=self.load_since)
+        for seq, txn in enumerate(self.transactions.values()):
+            txn.seq = seq
+        self._next_seq = len(self.transactions)
+        self._rebuild_indexes()
+        self.version += 1
         return self.transactions
+
+
+    # page in txns the storage has not loaded yet for first_date..last_date (None = open end)
+    def _ensure_loaded(self, first_date=None, last_date=None):
+        self._sync_indexes()
+        self._page_in(first_date, last_date)
+
+
+    # load and index the unloaded txns of first_date..last_date (batch changes must be synced or untouched by them)
+    def _page_in(self, first_date=None, last_date=None):
+        if not self.storage.has_unloaded():
+            return
+
+        older = self.storage.load_range(first_date, last_date)
+        for txn_id, txn in older.items():
+            txn.seq = self._take_seq()
+            self.transactions[txn_id] = txn
+            self._index_transaction(txn)
+            self.fingerprints.add(txn)
+        if older:
+            self.version += 1
+
+
+    # page in whatever the date criteria of a query can touch
+    def _ensure_loaded_for(self, date=None, from_date=None, to_date=None, month=None, **_):
+        self._sync_indexes()
+        bounds = criteria_bounds(date=date, from_date=from_date, to_date=to_date, month=month)
+        if date and bounds is None:
+            return      # only non-ISO date strings can equal it, and those are never paged out
+        if bounds is None:
+            self._ensure_loaded()
+        else:
+            self._ensure_loaded(*(datetime.fromordinal(ordinal).strftime("%Y-%m-%d") for ordinal in bounds))
+
+
+    # look up a txn by id, paging in older history when it is not loaded
+    def get_transaction(self, txn_id):
+        if txn_id not in self.transactions:
+            self._ensure_loaded()
+        return self.transactions.get(txn_id)
+
+
+    def _take_seq(self):
+        seq = self._next_seq
+        self._next_seq += 1
+        return seq
+
+
+    # whether a txn with this id exists, loaded or still on disk (asks the storage, pages nothing in)
+    def has_transaction(self, txn_id):
+        if txn_id in self.transactions:
+            return True
+        return self.storage.has_unloaded() and self.storage.has_unloaded_id(txn_id)
+
+
+    # build every index from the loaded txns
+    def _rebuild_indexes(self):
+        self.balance_index.rebuild(self.transactions)
+        self.date_index.rebuild(self.transactions)
+        self.posting_index.rebuild(self.transactions)
+        self.rollups.rebuild(self.transactions)
+        self.fingerprints.rebuild(self.transactions)
+
+
+    # add a txn to every index
+    def _index_transaction(self, txn):
+        self.balance_index.add(txn)
+        self.date_index.add(txn)
+        self.posting_index.add(txn)
+        self.rollups.add(txn)
+
+
+    # remove a txn from every index (must be called before its fields change)
+    def _unindex_transaction(self, txn):
+        self.balance_index.remove(txn)
+        self.date_index.remove(txn)
+        self.posting_index.remove(txn)
+        self.rollups.remove(txn)
+
+
+    # about to change/add/remove a txn: take it out of the indexes, or inside a batch just remember its state
+    # (the fingerprint index is always updated right away, so duplicate checks see earlier rows of a batch)
+    def _begin_change(self, txn_id):
+        txn = self.transactions.get(txn_id)
+        if txn is not None:
+            self.fingerprints.remove(txn)
+        if self._batch is not None:
+            self._batch.touch(txn_id, txn)
+        elif txn is not None:
+            self._unindex_transaction(txn)
+
+
+    # done changing a txn: index its new state (a batch does it once, in _sync_indexes)
+    def _end_change(self, txn_id):
+        txn = self.transactions.get(txn_id)
+        if txn is not None:
+            self.fingerprints.add(txn)
+        if self._batch is None and txn is not None:
+            self._index_transaction(txn)
+
+
+    # bring the indexes up to date with the txns a batch changed: one unindex/index per touched txn,
+    # or a single rebuild when the batch touched a large part of the ledger
+    def _sync_indexes(self):
+        batch = self._batch
+        if batch is None or not batch.unindexed:
+            return
+
+        if len(batch.unindexed) > len(self.transactions) // 4:
+            self._rebuild_indexes()
+        else:
+            for txn_id, indexed in batch.unindexed.items():
+                if indexed is not None:
+                    self._unindex_transaction(indexed)
+                if txn_id in self.transactions:
+                    self._index_transaction(self.transactions[txn_id])
+        batch.unindexed.clear()
+        batch.indexed_during = True
+
+
+    # group changes: everything inside the block is applied in memory, indexed once and persisted once
+    # at exit; an exception restores every txn the block touched and nothing is written
+    @contextmanager
+    def batch(self):
+        if self._batch is not None:     # nested: part of the outer batch
+            yield self
+            return
+
+        batch = self._batch = MutationBatch()
+        try:
+            yield self
+        except BaseException:
+            self._batch = None
+            self._rollback(batch)
+            raise
+
+        self._sync_indexes()
+        self._batch = None
+        if batch.save_all:
+            self.storage.save_all(self.transactions)
+        elif batch.records:
+            self.storage.record_mutations(batch.records, self.transactions)
+        self._log_changes(self._batch_changes(batch))
+
+
+    # put back the pre-batch state of every txn a failed batch touched
+    def _rollback(self, batch):
+        restored = False        # a deleted txn came back (at the end of the dict)
+        for txn_id, original in batch.originals.items():
+            if txn_id in self.transactions:
+                self.fingerprints.remove(self.transactions[txn_id])
+            if original is None:
+                self.transactions.pop(txn_id, None)
+            else:
+                restored = restored or txn_id not in self.transactions
+                self.transactions[txn_id] = original
+                self.fingerprints.add(original)
+
+        if restored:
+            # back to ledger order, in place since indexes and views hold this dict
+            ordered = sorted(self.transactions.values(), key=lambda txn: txn.seq)
+            self.transactions.clear()
+            self.transactions.update((txn.id, txn) for txn in ordered)
+
+        if batch.indexed_during:
+            self._rebuild_indexes()
+        self.version += 1
     
     
-    # saving txns in dictionary form and calling save_data to save data in json file
+    # write every txn through the storage backend
     def save_transactions(self):
-        transactions_dict = {
-            txn_id: txn.to_dict() for txn_id, txn in self.transactions.items()
-        }
-        save_data(self.filepath, transactions_dict)    # from utils
+        self.storage.save_all(self.transactions)
+
+
+    # persist a single mutation through the storage backend (queued until the end of a batch)
+    def _record_mutation(self, record):
+        if self._batch is not None:
+            self._batch.add_record(record)
+        else:
+            self.storage.record_mutation(record, self.transactions)
+            self._log_changes([(record["op"], record["id"])])
+
+
+    # one (op, txn_id) per txn a finished batch changed, from its pre-batch state and the current one
+    def _batch_changes(self, batch):
+        changes = []
+        for txn_id, original in batch.originals.items():
+            exists = txn_id in self.transactions
+            if original is None:
+                if exists:
+                    changes.append(("add", txn_id))
+            else:
+                changes.append(("update" if exists else "delete", txn_id))
+        return changes
+
+
+    # append persisted changes to the change log (used by delta exports)
+    def _log_changes(self, changes):
+        if self.changelog is not None and changes:
+            self.changelog.append(changes)
 
 
     # adding txn
@@ -33,123 +250,200 @@ class ExpenseManager:
         if not isinstance(transaction, Transaction):
             raise ValueError("Must be a Transaction instance")
         
-        if transaction.id in self.transactions:
+        if self.has_transaction(transaction.id):
             return False
         
+        self._begin_change(transaction.id)
+        transaction.seq = self._take_seq()
         self.transactions[transaction.id] = transaction
-        self.save_transactions()
+        self._end_change(transaction.id)
+        self.version += 1
+        self._record_mutation({"op": "add", "id": transaction.id, "txn": transaction.to_dict()})
         return True
 
 
     # update txns
     def update_transaction(self, txn_id:str, updated_fields):  
         
-        if txn_id not in self.transactions:
+        if self.get_transaction(txn_id) is None:
             return False
         
         transaction = self.transactions[txn_id]
         allowed_fields = {"amount", "category", "description", "date", "type"}
+        applied_fields = {}
 
+        self._begin_change(txn_id)
         for key, value in updated_fields.items():
             if key in allowed_fields and value is not None:
                 setattr(transaction, key, value)
+                applied_fields[key] = value
+        self._end_change(txn_id)
+        self.version += 1
 
-        self.save_transactions()
+        self._record_mutation({"op": "update", "id": txn_id, "fields": applied_fields})
         return True
         
 
     # delete txn
     def delete_transaction(self, txn_id:str):
-        if txn_id not in self.transactions:
+        if self.get_transaction(txn_id) is None:
             return False
         
+        self._begin_change(txn_id)
         del self.transactions[txn_id]
-        self.save_transactions()
+        self.version += 1
+        self._record_mutation({"op": "delete", "id": txn_id})
         return True
+
+
+    # add many txns in one batch, returns how many were added (ids already present are skipped)
+    def add_transactions(self, transactions):
+        with self.batch():
+            return sum(1 for transaction in transactions if self.add_transaction(transaction))
+
+
+    # apply {txn_id: updated_fields} in one batch, returns how many txns were found and updated
+    def update_many(self, updates):
+        with self.batch():
+            return sum(1 for txn_id, updated_fields in updates.items() if self.update_transaction(txn_id, updated_fields))
+
+
+    # delete many txns in one batch, returns how many were found and deleted
+    def delete_many(self, txn_ids):
+        with self.batch():
+            return sum(1 for txn_id in txn_ids if self.delete_transaction(txn_id))
     
 
-    # get daily summary details
-    def get_daily_summary(self, date):
+    # (exact, near) ids of other txns that look like duplicates of transaction: exact ones have the same
+    # date, amount, type, category and description (ignoring case and punctuation), near ones the same
+    # date, amount and type. Pages in the txn's day first when older history is not loaded.
+    def find_duplicates(self, transaction):
+        ordinal = transaction.date_ordinal
+        if ordinal is not None and self.storage.has_unloaded():
+            day = date.fromordinal(ordinal).isoformat()
+            self._page_in(day, day)
+        return self.fingerprints.exact_matches(transaction), self.fingerprints.near_matches(transaction)
+
+
+    # result of compute() cached under key until the next mutation
+    def _cached(self, key, compute):
+        found, result = self.query_cache.get(key, self.version)
+        if not found:
+            result = compute()
+            self.query_cache.put(key, self.version, result)
+        return result
+
+
+    # filter txns (cached per normalized criteria until the next mutation)
+    def filter_transactions(self, type=None, category=None, date=None, from_date=None, to_date=None, month=None):
+        criteria = dict(type=type, category=category, date=date, from_date=from_date, to_date=to_date, month=month)
+        self._ensure_loaded_for(**criteria)
+        return self._cached(("filter",) + normalize_criteria(**criteria), lambda: self._filter_transactions(criteria))
+
+
+    # run a filter, pushed down to the storage backend when it can answer queries itself
+    def _filter_transactions(self, criteria):
+        if self._storage_answers_queries():
+            ids = self.storage.query_ids(**criteria)
+            if TransactionQuery(**criteria).has_date_criterion:
+                ids += list(self._irregular_matches(**criteria))     # the backend matches zero-padded dates only
+            ids = [txn_id for txn_id in ids if txn_id in self.transactions]
+            ids.sort(key=lambda txn_id: self.transactions[txn_id].seq)      # ledger order, as without sqlite
+            return TransactionView(self.transactions, ids)
+
+        return filter_by_criteria(self.transactions, **criteria, date_index=self.date_index, posting_index=self.posting_index)
+
+
+    # (type, category, amount, count) groups for the criteria
+    def _aggregate(self, **criteria):
+        if self._storage_answers_queries():
+            groups = self.storage.aggregate(**criteria)
+            if TransactionQuery(**criteria).has_date_criterion:
+                groups += [(txn.type, txn.category, txn.amount, 1) for txn in self._irregular_matches(**criteria).values()]
+            return groups
+
+        transactions = filter_by_criteria(self.transactions, **criteria, date_index=self.date_index, posting_index=self.posting_index)
+        return [(txn.type, txn.category, txn.amount, 1) for txn in transactions.values()]
+
+
+    # whether filters and aggregates can go to the storage backend: not while a batch is open, since
+    # the backend has not seen the batch's changes yet
+    def _storage_answers_queries(self):
+        return self.storage.supports_queries and self._batch is None
+
+
+    # {txn_id: txn} of the txns with a non ISO date string that match the criteria
+    def _irregular_matches(self, **criteria):
+        irregular = {txn_id: self.transactions[txn_id] for txn_id in self.date_index.irregular}
+        return filter_by_criteria(irregular, **criteria)
+
+
+    # build summary dict from aggregated groups
+    @staticmethod
+    def _build_summary(groups, carry_forward):
         summary = {}
         num_income = 0
         num_expense = 0
         total_income = 0
         total_expense = 0
         category_breakdown = defaultdict(float)
-        
-        transactions = filter_by_criteria(self.transactions, date=date)
-        for txn in transactions.values():
-            if txn.type == 'income':
-                total_income += txn.amount
-                num_income += 1
+
+        for type_, category, amount, count in groups:
+            if type_ == 'income':
+                total_income += amount
+                num_income += count
             else:
-                total_expense += txn.amount
-                category_breakdown[txn.category] += txn.amount
-                num_expense += 1
+                total_expense += amount
+                category_breakdown[category] += amount
+                num_expense += count
 
         summary['income'] = total_income
         summary['expense'] = total_expense
-        summary["carry_forward"] = self._calculate_carry_forward(date)
+        summary['carry_forward'] = carry_forward
         summary['balance'] = total_income - total_expense
         summary['num_income'] = num_income
         summary['num_expense'] = num_expense
         summary['breakdown'] = dict(category_breakdown)
 
         return summary
+
+
+    # get daily summary details (read from the daily rollup, cached until the next mutation)
+    def get_daily_summary(self, date):
+        self._ensure_loaded_for(date=date)
+        return self._cached(("daily", date), lambda: self._build_summary(self.rollups.day_groups(date), self._calculate_carry_forward(date)))
     
 
-    # get monthly summary details
+    # get monthly summary details (cached until the next mutation)
     def get_monthly_summary(self, month):
-        summary = {}
-        num_income = 0
-        num_expense = 0
-        total_income = 0
-        total_expense = 0
-        category_breakdown = defaultdict(float)
-        
-        transactions = filter_by_criteria(self.transactions, month=month)
-        
-        for txn in transactions.values():
-            if txn.type == 'income':
-                total_income += txn.amount
-                num_income += 1
-            else:
-                total_expense += txn.amount
-                category_breakdown[txn.category] += txn.amount
-                num_expense += 1
+        self._ensure_loaded_for(month=month)
+        return self._cached(("monthly", month), lambda: self._monthly_summary(month))
 
-        first_day_of_month = f"{month}-01"
-        carry_forward = self._calculate_carry_forward(first_day_of_month)
 
-        summary['income'] = total_income
-        summary['expense'] = total_expense
-        summary['carry_forward'] = carry_forward
-        summary['balance'] = total_income - total_expense
-        summary['num_income'] = num_income
-        summary['num_expense'] = num_expense
-        summary['breakdown'] = dict(category_breakdown)
-
-        return summary
+    # monthly summary from the monthly rollup, other prefixes are aggregated
+    def _monthly_summary(self, month):
+        first_day_of_month = f"{month}-01"
+        groups = self.rollups.month_groups(month)
+        if groups is None:
+            groups = self._aggregate(month=month)
+        return self._build_summary(groups, self._calculate_carry_forward(first_day_of_month))
     
 
-    # get category details
-    def get_category_breakdown(self, type_):
-        category_wise_summary = {}
-        
-        for txn in self.transactions.values():
-            if txn.type == type_:
-                category = txn.category
-                amount = txn.amount
+    # get category details: whole ledger from the posting index totals, or summed over the given txns
+    def get_category_breakdown(self, type_, transactions=None):
+        if transactions is None:
+            self._ensure_loaded()
+            return self.posting_index.category_totals(type_)
 
-                if category in category_wise_summary:
-                    category_wise_summary[category] += amount
-                else:
-                    category_wise_summary[category] = amount
+        category_wise_summary = defaultdict(float)
+        for txn in transactions:
+            if txn.type == type_:
+                category_wise_summary[txn.category] += txn.amount
 
-        return category_wise_summary
+        return dict(category_wise_summary)
 
 
-    # calculate carry forward
+    # calculate carry forward (balance of everything before the date) from the balance index
     def _calculate_carry_forward(self, date_str):
 
         try:
@@ -157,29 +451,21 @@ class ExpenseManager:
         except ValueError:
             raise ValueError("Invalid date format. Use YYYY-MM-DD.")
 
-        carry_forward = 0.0
-
-        for txn in self.transactions.values():
-
-            try:
-                txn_date = datetime.strptime(txn.date, "%Y-%m-%d").date()
-            except ValueError:
-                continue  # Skip invalid date entries
-            if txn_date < target_date:
-                if txn.type == "income":
-                    carry_forward += txn.amount
-                elif txn.type == "expense":
-                    carry_forward -= txn.amount
-
-        return carry_forward
+        # older txns still on disk only count as an opening balance once the date is inside the loaded window
+        self._ensure_loaded(date_str, date_str)
+        return self.balance_index.balance_before(target_date.toordinal()) + self.storage.unloaded_balance_before(date_str)
             
               
-    # get top categories
+    # get top categories (expense totals of the month, largest first)
     def get_top_categories(self, month:str, top_n: int = 5) -> list:
-        txns = self.get_monthly_transactions(month)  
-        category_totals = defaultdict(float)
+        self._ensure_loaded_for(month=month)
+        groups = self.rollups.month_groups(month)
+        if groups is not None:
+            category_totals = {category: amount for type_, category, amount, _ in groups if type_ == "expense"}
+            return sorted(category_totals.items(), key=lambda x: x[1], reverse=True)[:top_n]
 
-        for txn in txns:
+        category_totals = defaultdict(float)
+        for txn in self.get_monthly_transactions(month):
             if txn.type == "expense":
                 category_totals[txn.category] += txn.amount
                     
@@ -187,15 +473,26 @@ class ExpenseManager:
         return sorted_totals[:top_n]
 
 
-    # get monthly txns
-    def get_monthly_transactions(self, month: str):
-        monthly_txns = []
-        for txn in self.transactions.values():
-
-            txn_date_str = txn.date.strftime("%Y-%m") if isinstance(txn.date, (date, datetime)) else txn.date
+    # today + this month + top categories for the dashboard, cached until the next mutation
+    def get_dashboard_snapshot(self, today=None, top_n: int = 5):
+        today = today or date.today()
+        cached = self._dashboard
+        if cached is not None and (cached.version, cached.today, cached.top_n) == (self.version, today, top_n):
+            return cached
 
-            if txn_date_str.startswith(month):
-                monthly_txns.append(txn)
+        month = today.strftime("%Y-%m")
+        snapshot = DashboardSnapshot(
+            today=today,
+            today_summary=self.get_daily_summary(today.strftime("%Y-%m-%d")),
+            month_summary=self.get_monthly_summary(month),
+            top_categories=self.get_top_categories(month, top_n),
+            top_n=top_n,
+            version=self.version,
+        )
+        self._dashboard = snapshot
+        return snapshot
 
-        return monthly_txns
 
+    # get monthly txns
+    def get_monthly_transactions(self, month: str):
+        return list(self.filter_transactions(month=month).values())
@@ -0,0 +1,85 @@
+import os
+import sys
+import marshal
+import hashlib
+from pathlib import Path
+
+from core.transaction import Transaction
+
+
+class SnapshotCache:
+    """
+    Parsed copy of a snapshot json file, stored next to it as marshalled compact columns
+    (id, type code, category code, amount in minor units, date ordinal, raw date, description).
+    It is only used while the json file still has the size, mtime and head/tail hash it
+    had when the cache was written; otherwise the caller re-parses the json and rewrites it.
+    """
+
+    FORMAT = 1
+    HASH_BLOCK = 1 << 16    # bytes hashed from each end of the json file
+
+    def __init__(self, filepath):
+        self.filepath = Path(filepath)
+        self.cache_path = self.filepath.with_name(self.filepath.name + ".cache")
+
+
+    # (txn_id, Transaction) pairs from the cache, built one at a time; None when it is missing or stale
+    def load(self):
+        stamp = self._stamp()
+        if stamp is None:
+            return None
+        try:
+            with open(self.cache_path, 'rb') as file:
+                header, type_names, category_names, columns = marshal.loads(file.read())   # one read: marshal.load(file) is far slower
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if header != (self.FORMAT, sys.version_info[:2], stamp):
+            return None
+
+        ids, type_codes, category_codes, amounts, ordinals, raw_dates, descriptions = columns
+        types = [sys.intern(name) for name in type_names]
+        categories = [sys.intern(name) for name in category_names]
+        from_compact = Transaction.from_compact
+        return (
+            (txn_id, from_compact(txn_id, types[type_code], categories[category_code], amount, ordinal, raw_date, description))
+            for txn_id, type_code, category_code, amount, ordinal, raw_date, description
+            in zip(ids, type_codes, category_codes, amounts, ordinals, raw_dates, descriptions)
+        )
+
+
+    # write the cache for the json file as it is on disk now (txns must be exactly its contents);
+    # `transactions` may be a stream, only its compact columns are kept
+    def save(self, transactions):
+        type_codes, category_codes = {}, {}
+        columns = ([], [], [], [], [], [], [])
+        for txn_id, txn in transactions:
+            values = (txn_id, type_codes.setdefault(txn.type, len(type_codes)),
+                      category_codes.setdefault(txn.category, len(category_codes)),
+                      txn.amount_minor, txn.date_ordinal, txn._raw_date, txn.description)
+            for column, value in zip(columns, values):
+                column.append(value)
+
+        stamp = self._stamp()
+        if stamp is None:
+            return
+        tmp_path = f"{self.cache_path}.tmp"
+        try:
+            with open(tmp_path, 'wb') as file:
+                marshal.dump(((self.FORMAT, sys.version_info[:2], stamp), list(type_codes), list(category_codes), columns), file)
+            os.replace(tmp_path, self.cache_path)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not write snapshot cache: {e}")
+
+
+    # (size, mtime_ns, hash of the first and last block) of the json file, None if it does not exist
+    def _stamp(self):
+        try:
+            stat = os.stat(self.filepath)
+            with open(self.filepath, 'rb') as file:
+                digest = hashlib.blake2b(file.read(self.HASH_BLOCK), digest_size=16)
+                if stat.st_size > self.HASH_BLOCK:
+                    file.seek(max(stat.st_size - self.HASH_BLOCK, self.HASH_BLOCK))
+                    digest.update(file.read())
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns, digest.hexdigest()
@@ -0,0 +1,602 @@
+import os
+import json
+import sqlite3
+from datetime import date
+from itertools import chain
+from pathlib import Path
+
+from core.transaction import Transaction
+from core.indexes import date_to_ordinal, net_minor
+from core.snapshot import SnapshotCache
+from utils.json_io import iter_data_items, save_data_items, save_data, CODECS, CorruptFileError, load_data, append_journal_records, load_journal, clear_journal, DATA_DIR, load_user_info, save_user_setting
+
+
+# Every backend persists the same mutation records the manager produces:
+#   {"op": "add", "id": ..., "txn": {...}}
+#   {"op": "update", "id": ..., "fields": {...}}
+#   {"op": "delete", "id": ...}
+
+
+class JsonStorage:
+    """
+    Snapshot file (json, or another codec from utils.json_io) plus an append-only journal of mutations.
+    The snapshot is streamed record by record (or read from its SnapshotCache when that is fresh);
+    with `since` only txns dated on/after it are kept and older ones are paged in on demand
+    through load_range(). Older txns are dropped as they stream past, so peak memory is the window
+    plus the cache's compact columns for the whole history.
+    """
+
+    supports_queries = False
+
+    # number of journal records after which the journal is folded into the snapshot
+    COMPACT_THRESHOLD = 500
+
+    def __init__(self, filepath, use_journal=True, codec="json"):
+        self.filepath = filepath
+        self.use_journal = use_journal
+        self.codec = CODECS[codec]
+        self.journal_size = 0
+        self.loaded_from = None         # ordinal of the window start, None when everything is loaded
+        self.opening_balance = 0        # net minor units of the txns left on disk (all dated before the window)
+        self.pinned_ids = set()         # ids touched by the journal or this session, never paged out
+        self.paged_out_ids = set()      # ids of the txns left on disk
+        self.snapshot_cache = SnapshotCache(filepath)
+
+
+    # load snapshot (optionally only from `since`, "YYYY-MM-DD") and replay the journal on top of it
+    def load(self, since=None):
+        journal = load_journal(self.filepath)
+        self.pinned_ids = {record.get("id") for record in journal}
+        self.loaded_from = date_to_ordinal(since) if since else None
+        self.opening_balance = 0
+        self.paged_out_ids = set()
+
+        transactions = {}
+        cached = self.snapshot_cache.load()
+        try:
+            if cached is not None:
+                for _ in self._route(cached, transactions):
+                    pass
+            else:
+                # the cache is filled as the json streams past: only txns in the window become resident
+                self.snapshot_cache.save(self._route(self._parse_snapshot(), transactions))
+        except (json.JSONDecodeError, CorruptFileError):
+            print("⚠️ Transaction file is empty or corrupted. Starting fresh.")
+            transactions, self.opening_balance = {}, 0
+            self.paged_out_ids = set()
+
+        if not self.paged_out_ids:
+            self.loaded_from = None
+
+        for record in journal:
+            apply_record(transactions, record)
+        self.journal_size = len(journal)
+
+        if self.journal_size >= self.COMPACT_THRESHOLD:
+            self.save_all(transactions)
+        return transactions
+
+
+    def has_unloaded(self):
+        return self.loaded_from is not None
+
+
+    # whether txn_id belongs to a txn left on disk
+    def has_unloaded_id(self, txn_id):
+        return txn_id in self.paged_out_ids
+
+
+    # txns still on disk that fall in [first_date, last_date] ("YYYY-MM-DD" or None for open ends);
+    # everything before the window is a single page, so it is loaded as a whole
+    def load_range(self, first_date=None, last_date=None):
+        if not self.has_unloaded():
+            return {}
+        first = date_to_ordinal(first_date) if first_date else None
+        if first is not None and first >= self.loaded_from:
+            return {}
+
+        older = dict(self._iter_paged_out())
+        self.loaded_from = None
+        self.opening_balance = 0
+        self.pinned_ids = set()
+        self.paged_out_ids = set()
+        return older
+
+
+    # net balance of txns still on disk dated before date_str; callers page in dates before the window first
+    def unloaded_balance_before(self, date_str):
+        return self.opening_balance / 100
+
+
+    # rewrite the snapshot (and its cache), which now holds every journaled change (paged-out txns are carried over)
+    def save_all(self, transactions):
+        records = list(transactions.items())
+        if self.has_unloaded():
+            records = list(chain(self._iter_paged_out(), records))
+            self.pinned_ids.update(transactions)    # now in the snapshot as well, must never be paged out
+
+        self.codec.save_items(self.filepath, ((txn_id, txn.to_dict()) for txn_id, txn in records))    # from utils
+        self.snapshot_cache.save(records)
+        clear_journal(self.filepath)
+        self.journal_size = 0
+
+
+    # persist a single mutation: append to journal, or rewrite the snapshot when journaling is off
+    def record_mutation(self, record, transactions):
+        self.record_mutations([record], transactions)
+
+
+    # persist a batch of mutations with one journal write (or one snapshot rewrite)
+    def record_mutations(self, records, transactions):
+        if self.has_unloaded():
+            self.pinned_ids.update(record.get("id") for record in records)
+
+        if not self.use_journal:
+            self.save_all(transactions)
+            return
+
+        append_journal_records(self.filepath, records)     # from utils
+        self.journal_size += len(records)
+        if self.journal_size >= self.COMPACT_THRESHOLD:
+            self.save_all(transactions)
+
+
+    # put every snapshot record into `transactions` or the paged-out page, passing each one on
+    def _route(self, records, transactions):
+        for txn_id, txn in records:
+            if self._is_paged_out(txn_id, txn):
+                self.opening_balance += net_minor(txn)
+                self.paged_out_ids.add(txn_id)
+            else:
+                transactions[txn_id] = txn
+            yield txn_id, txn
+
+
+    # a txn stays on disk when it is older than the window and the journal never touched it
+    def _is_paged_out(self, txn_id, txn):
+        return (self.loaded_from is not None and txn.date_ordinal is not None
+                and txn.date_ordinal < self.loaded_from and txn_id not in self.pinned_ids)
+
+
+    def _iter_paged_out(self):
+        cached = self.snapshot_cache.load()
+        for txn_id, txn in (cached if cached is not None else self._parse_snapshot()):
+            if self._is_paged_out(txn_id, txn):
+                yield txn_id, txn
+
+
+    def _parse_snapshot(self):
+        for txn_id, data in self.codec.iter_items(self.filepath):     # from utils
+            yield txn_id, Transaction.from_dict(data)
+
+
+class ShardedJsonStorage:
+    """
+    One json file per month ("YYYY-MM.json", same layout as the single-file snapshot) plus a manifest
+    holding the count and net balance (minor units) of every shard. A mutation rewrites only the
+    shard(s) of the txn it touches; load() opens the shards from `since` on and load_range() opens
+    only the months a query asks for. Dates that are not zero-padded ISO go to the "other" shard,
+    which is always loaded.
+    """
+
+    supports_queries = False
+
+    MANIFEST = "manifest.json"
+    OTHER_SHARD = "other"
+
+    def __init__(self, dirpath):
+        self.dirpath = Path(dirpath)
+        self.filepath = self.dirpath
+        self.manifest = {}          # shard -> {"count": n, "net": minor units}
+        self.loaded_shards = set()
+        self.shard_of = {}          # txn_id -> shard, for loaded txns
+        self.resident_net = {}      # txn_id -> net minor units, for loaded txns written into an unopened shard
+        self.unloaded_ids = {}      # unopened shard -> its ids, read on the first has_unloaded_id()
+
+
+    # read the manifest and open every shard from the month of `since` on ("YYYY-MM-DD")
+    def load(self, since=None):
+        self.manifest = dict(load_data(self.dirpath / self.MANIFEST).get("shards", {}))      # from utils
+        self.loaded_shards = set()
+        self.shard_of = {}
+        self.resident_net = {}
+        self.unloaded_ids = {}
+
+        first_month = month_of(since) if since else None
+        shards = [shard for shard in self.manifest
+                  if shard == self.OTHER_SHARD or first_month is None or shard >= first_month]
+        return self._load_shards(shards)
+
+
+    def has_unloaded(self):
+        return any(shard not in self.loaded_shards for shard in self.manifest)
+
+
+    # whether txn_id is stored in an unopened shard; each shard's ids are read once and kept
+    def has_unloaded_id(self, txn_id):
+        for shard in self.manifest:
+            if shard in self.loaded_shards:
+                continue
+            if shard not in self.unloaded_ids:
+                self.unloaded_ids[shard] = {row_id for row_id, _ in iter_data_items(self._shard_path(shard))}     # from utils
+            if txn_id in self.unloaded_ids[shard]:
+                return True
+        return False
+
+
+    # txns of the unopened month shards that overlap [first_date, last_date] (None for open ends)
+    def load_range(self, first_date=None, last_date=None):
+        first = month_of(first_date) if first_date else None
+        last = month_of(last_date) if last_date else None
+        shards = [shard for shard in self.manifest
+                  if shard not in self.loaded_shards
+                  and (first is None or shard >= first) and (last is None or shard <= last)]
+        return self._load_shards(shards)
+
+
+    # net balance of the unopened months before date_str, straight from the manifest
+    # (minus txns already in memory that were written into those shards)
+    def unloaded_balance_before(self, date_str):
+        month = month_of(date_str)
+        on_disk = sum(info["net"] for shard, info in self.manifest.items()
+                      if shard not in self.loaded_shards and shard != self.OTHER_SHARD and shard < month)
+        in_memory = sum(net for txn_id, net in self.resident_net.items() if self.shard_of[txn_id] < month)
+        return (on_disk - in_memory) / 100
+
+
+    # rewrite the shards of every loaded month (unopened shards keep their rows on disk)
+    def save_all(self, transactions):
+        groups = {shard: {} for shard in self.loaded_shards}
+        for txn_id, txn in transactions.items():
+            groups.setdefault(self.shard_key(txn), {})[txn_id] = txn.to_dict()
+
+        self.shard_of = {}
+        self.resident_net = {}
+        for shard, rows in groups.items():
+            self.shard_of.update(dict.fromkeys(rows, shard))
+            if shard not in self.loaded_shards and shard in self.manifest:
+                self.resident_net.update((txn_id, net_minor(transactions[txn_id])) for txn_id in rows)
+                rows = {**dict(iter_data_items(self._shard_path(shard))), **rows}      # from utils
+            self._write_shard(shard, rows)
+            if shard in self.unloaded_ids:
+                self.unloaded_ids[shard] = set(rows)
+        self._save_manifest()
+
+
+    # persist a single mutation by rewriting the shard it left and the shard it landed in
+    def record_mutation(self, record, transactions):
+        self.record_mutations([record], transactions)
+
+
+    # persist a batch of mutations, rewriting every affected shard once with the final state of its txns
+    def record_mutations(self, records, transactions):
+        affected = {}       # shard -> ids to rewrite in it
+        for txn_id in dict.fromkeys(record.get("id") for record in records):
+            txn = transactions.get(txn_id)
+            old_shard = self.shard_of.pop(txn_id, None)
+            self.resident_net.pop(txn_id, None)
+            if old_shard is not None:
+                affected.setdefault(old_shard, []).append(txn_id)
+            if txn is not None:
+                shard = self.shard_of[txn_id] = self.shard_key(txn)
+                affected.setdefault(shard, []).append(txn_id)
+                if shard not in self.loaded_shards and shard in self.manifest:
+                    self.resident_net[txn_id] = net_minor(txn)
+
+        for shard, txn_ids in affected.items():
+            rows = dict(iter_data_items(self._shard_path(shard)))       # from utils
+            for txn_id in txn_ids:
+                if self.shard_of.get(txn_id) == shard:
+                    rows[txn_id] = transactions[txn_id].to_dict()
+                else:
+                    rows.pop(txn_id, None)
+            self._write_shard(shard, rows)
+            if shard in self.unloaded_ids:
+                self.unloaded_ids[shard] = set(rows)
+        self._save_manifest()
+
+
+    # "YYYY-MM" month of a txn, or the shard for dates that are not zero-padded ISO
+    @classmethod
+    def shard_key(cls, txn):
+        return txn.date[:7] if txn.date_ordinal is not None else cls.OTHER_SHARD
+
+
+    def _shard_path(self, shard):
+        return self.dirpath / f"{shard}.json"
+
+
+    def _load_shards(self, shards):
+        transactions = {}
+        for shard in sorted(shards):
+            for txn_id, data in iter_data_items(self._shard_path(shard)):     # from utils
+                if txn_id not in self.shard_of:
+                    transactions[txn_id] = Transaction.from_dict(data)
+                    self.shard_of[txn_id] = shard
+            self.loaded_shards.add(shard)
+            self.unloaded_ids.pop(shard, None)
+
+        self.resident_net = {txn_id: net for txn_id, net in self.resident_net.items()
+                             if self.shard_of[txn_id] not in self.loaded_shards}
+        return transactions
+
+
+    # write one shard (removing it when it is empty) and refresh its manifest entry;
+    # a shard that did not exist yet holds only loaded txns, so it counts as loaded
+    def _write_shard(self, shard, rows):
+        if shard not in self.manifest:
+            self.loaded_shards.add(shard)
+
+        self.dirpath.mkdir(parents=True, exist_ok=True)
+        path = self._shard_path(shard)
+        if rows:
+            save_data_items(path, rows.items())     # from utils
+            self.manifest[shard] = {
+                "count": len(rows),
+                "net": sum(net_minor(Transaction.from_dict(data)) for data in rows.values()),
+            }
+        else:
+            if path.exists():
+                os.remove(path)
+            self.manifest.pop(shard, None)
+
+
+    def _save_manifest(self):
+        save_data(self.dirpath / self.MANIFEST, {"format": 1, "shards": dict(sorted(self.manifest.items()))})     # from utils
+
+
+class SqliteStorage:
+    """SQLite database (WAL mode) with indexes on date, type and category."""
+
+    supports_queries = True
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS transactions (
+            id TEXT PRIMARY KEY,
+            type TEXT NOT NULL,
+            amount REAL NOT NULL,
+            category TEXT NOT NULL,
+            date TEXT NOT NULL,
+            description TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions(date);
+        CREATE INDEX IF NOT EXISTS idx_transactions_type ON transactions(type);
+        CREATE INDEX IF NOT EXISTS idx_transactions_category ON transactions(category);
+    """
+    COLUMNS = ("id", "type", "amount", "category", "date", "description")
+    UPDATABLE_COLUMNS = {"type", "amount", "category", "date", "description"}
+    ISO_DATE_GLOB = "[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]"
+
+    def __init__(self, db_path):
+        self.filepath = db_path
+        self.conn = sqlite3.connect(str(db_path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+
+
+    # load all rows as Transaction objects (the database answers queries itself, so no window is applied)
+    def load(self, since=None):
+        rows = self.conn.execute(f"SELECT {', '.join(self.COLUMNS)} FROM transactions")
+        return {row[0]: Transaction.from_dict(dict(zip(self.COLUMNS, row))) for row in rows}
+
+
+    def has_unloaded(self):
+        return False
+
+
+    def has_unloaded_id(self, txn_id):
+        return False
+
+
+    def unloaded_balance_before(self, date_str):
+        return 0.0
+
+
+    # replace every row with the given transactions
+    def save_all(self, transactions):
+        with self.conn:
+            self.conn.execute("DELETE FROM transactions")
+            self.conn.executemany(
+                "INSERT INTO transactions VALUES (?, ?, ?, ?, ?, ?)",
+                (self._row(txn.to_dict()) for txn in transactions.values())
+            )
+
+
+    # persist a single mutation as one statement
+    def record_mutation(self, record, transactions):
+        self.record_mutations([record], transactions)
+
+
+    # persist a batch of mutations in one sqlite transaction
+    def record_mutations(self, records, transactions):
+        with self.conn:
+            for record in records:
+                self._execute_record(record)
+
+
+    def _execute_record(self, record):
+        op = record.get("op")
+        if op == "add":
+            self.conn.execute("INSERT OR REPLACE INTO transactions VALUES (?, ?, ?, ?, ?, ?)", self._row(record["txn"]))
+        elif op == "update":
+            fields = {key: value for key, value in record["fields"].items() if key in self.UPDATABLE_COLUMNS}
+            if fields:
+                assignments = ", ".join(f"{key} = ?" for key in fields)
+                self.conn.execute(f"UPDATE transactions SET {assignments} WHERE id = ?", (*fields.values(), record["id"]))
+        elif op == "delete":
+            self.conn.execute("DELETE FROM transactions WHERE id = ?", (record["id"],))
+
+
+    # ids of rows matching the same criteria as utils.filtering.filter_by_criteria
+    def query_ids(self, type=None, category=None, date=None, from_date=None, to_date=None, month=None):
+        where, params = self._where(type=type, category=category, date=date, from_date=from_date, to_date=to_date, month=month)
+        return [row[0] for row in self.conn.execute(f"SELECT id FROM transactions{where}", params)]
+
+
+    # (type, category, total amount, count) groups for the given criteria
+    def aggregate(self, **criteria):
+        where, params = self._where(**criteria)
+        return self.conn.execute(
+            f"SELECT type, category, SUM(amount), COUNT(*) FROM transactions{where} GROUP BY type, category",
+            params
+        ).fetchall()
+
+
+    def close(self):
+        self.conn.close()
+
+
+    # build WHERE clause; date beats range beats month, like filter_by_criteria. Date criteria only match
+    # zero-padded dates (compared as strings, range bounds padded too): the manager matches other date
+    # strings in memory, the way filter_by_criteria compares them
+    @classmethod
+    def _where(cls, type=None, category=None, date=None, from_date=None, to_date=None, month=None):
+        clauses, params = [], []
+        if type:
+            clauses.append("type = ?")
+            params.append(type)
+        if category:
+            clauses.append("category = ?")
+            params.append(category)
+
+        if date:
+            clauses.append("date = ?")
+            params.append(date)
+        elif from_date and to_date:
+            clauses.append("date BETWEEN ? AND ?")
+            params.extend([iso_date(from_date), iso_date(to_date)])
+        elif month:
+            # prefix match written as a range so the date index is used
+            clauses.append("date >= ? AND date < ?")
+            params.extend([month, month + "\uffff"])
+        if date or (from_date and to_date) or month:
+            clauses.append("date GLOB ?")
+            params.append(cls.ISO_DATE_GLOB)
+
+        where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+        return where, params
+
+
+    @classmethod
+    def _row(cls, data):
+        return tuple(data.get(column) for column in cls.COLUMNS)
+
+
+# re-apply one mutation record on an in-memory dict (safe to apply twice)
+def apply_record(transactions, record):
+    op = record.get("op")
+    txn_id = record.get("id")
+
+    if op == "add":
+        transactions[txn_id] = Transaction.from_dict(record["txn"])
+    elif op == "update" and txn_id in transactions:
+        for key, value in record["fields"].items():
+            setattr(transactions[txn_id], key, value)
+    elif op == "delete":
+        transactions.pop(txn_id, None)
+
+
+# zero-padded "YYYY-MM-DD" of a date string like "2024-9-1", raises ValueError when it cannot be parsed
+def iso_date(date_str):
+    ordinal = date_to_ordinal(date_str)
+    if ordinal is None:
+        raise ValueError("Invalid date format. Use YYYY-MM-DD.")
+    return date.fromordinal(ordinal).isoformat()
+
+
+# "YYYY-MM" of a date string, None when it cannot be parsed
+def month_of(date_str):
+    ordinal = date_to_ordinal(date_str)
+    return None if ordinal is None else date.fromordinal(ordinal).isoformat()[:7]
+
+
+# sqlite database file of a user
+def get_transaction_db(user_id):
+    return DATA_DIR / f"transactions_{user_id}.db"
+
+
+# folder holding the month shards of a user
+def get_transaction_shard_dir(user_id):
+    return DATA_DIR / f"transactions_{user_id}"
+
+
+# open the storage backend selected for the user ("json" unless the user was migrated)
+def open_user_storage(user_id, json_filepath):
+    user_info = load_user_info(user_id) or {}
+    if user_info.get("storage") == "sqlite":
+        return SqliteStorage(get_transaction_db(user_id))
+    if user_info.get("storage") == "sharded":
+        return ShardedJsonStorage(get_transaction_shard_dir(user_id))
+    if user_info.get("storage") in CODECS:
+        codec = CODECS[user_info["storage"]]
+        return JsonStorage(Path(json_filepath).with_suffix(codec.suffix), codec=codec.name)
+    return JsonStorage(json_filepath)
+
+
+# raise FileExistsError rather than overwrite what may be newer data than the json file
+def _refuse_existing(destination):
+    if Path(destination).exists():
+        raise FileExistsError(f"{destination} already exists")
+
+
+# copy a user's json transactions (snapshot + journal) into a new sqlite database
+def migrate_json_to_sqlite(json_filepath, db_path):
+    _refuse_existing(db_path)
+    transactions = JsonStorage(json_filepath).load()
+    storage = SqliteStorage(db_path)
+    storage.save_all(transactions)
+    storage.close()
+    return len(transactions)
+
+
+# split a user's json transactions (snapshot + journal) into month shards in a new folder
+def convert_json_to_shards(json_filepath, shard_dir):
+    _refuse_existing(shard_dir)
+    transactions = JsonStorage(json_filepath).load()
+    storage = ShardedJsonStorage(shard_dir)
+    storage.load()
+    storage.save_all(transactions)
+    return len(transactions)
+
+
+# rewrite a user's json transactions (snapshot + journal) as a new snapshot in another codec
+def convert_json_to_codec(json_filepath, codec_name):
+    destination = Path(json_filepath).with_suffix(CODECS[codec_name].suffix)
+    _refuse_existing(destination)
+    transactions = JsonStorage(json_filepath).load()
+    JsonStorage(destination, codec=codec_name).save_all(transactions)
+    return len(transactions)
+
+
+# migrate every data/transactions_<uid>.json and switch those users to sqlite (or month shards, or a codec).
+# Users already switched away from json are skipped: their json file is stale, and copying it would
+# overwrite their real transactions
+def migrate_all_users(target="sqlite"):
+    for json_filepath in sorted(DATA_DIR.glob("transactions_*.json")):
+        user_id = json_filepath.stem.split("_", 1)[1]
+        current = (load_user_info(user_id) or {}).get("storage", "json")
+        if current != "json":
+            print(f"⚠️ {user_id}: already uses {current} storage, skipped")
+            continue
+
+        try:
+            if target == "sharded":
+                destination = get_transaction_shard_dir(user_id)
+                count = convert_json_to_shards(json_filepath, destination)
+            elif target in CODECS:
+                destination = json_filepath.with_suffix(CODECS[target].suffix)
+                count = convert_json_to_codec(json_filepath, target)
+            else:
+                destination = get_transaction_db(user_id)
+                count = migrate_json_to_sqlite(json_filepath, destination)
+        except FileExistsError as e:
+            print(f"⚠️ {user_id}: {e}, skipped (move it away to migrate again)")
+            continue
+        save_user_setting(user_id, "storage", target)
+        print(f"✅ {user_id}: migrated {count} transactions to {destination}")
+
+
+if __name__ == "__main__":
+    import sys
+    migrate_all_users(sys.argv[1] if len(sys.argv) > 1 else "sqlite")
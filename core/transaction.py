@@ -1,24 +1,83 @@
+import re
+import sys
 import uuid
-from datetime import date, datetime 
+from datetime import date, datetime
+
+ISO_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
 
 class Transaction:
+    # compact layout: no per-instance __dict__, interned type/category strings,
+    # date kept as an ordinal and amount as integer minor units (paise/cents);
+    # seq is the ledger position the manager gives it, so filtered results keep ledger order
+    __slots__ = ("id", "_type", "_category", "amount_minor", "date_ordinal", "_raw_date", "description", "seq")
+
     def __init__(self, type, amount, category, date, id=None, description=None):
         self.id = id if id is not None else str(uuid.uuid4())   # Use the passed id if available, otherwise generate a new one
         self.type = type
         self.amount = amount
         self.category = category
-        self.date = self.clean_date(date)
+        self.date = date
         self.description = description
-        
+        self.seq = 0
+
     @staticmethod
     def clean_date(value):
         if isinstance(value, str):
             return value.strip()[:10]  # Always get YYYY-MM-DD
-        elif isinstance(value, datetime.date):
+        elif isinstance(value, (date, datetime)):
             return value.strftime("%Y-%m-%d")
         return str(value)[:10]
 
 
+    @property
+    def type(self):
+        return self._type
+
+    @type.setter
+    def type(self, value):
+        self._type = sys.intern(value) if isinstance(value, str) else value
+
+
+    @property
+    def category(self):
+        return self._category
+
+    @category.setter
+    def category(self, value):
+        self._category = sys.intern(value) if isinstance(value, str) else value
+
+
+    @property
+    def amount(self):
+        return self.amount_minor / 100
+
+    @amount.setter
+    def amount(self, value):
+        self.amount_minor = round(float(value) * 100)
+
+
+    # zero-padded ISO dates are stored as an ordinal, anything else is kept as the raw string
+    @property
+    def date(self):
+        if self.date_ordinal is not None:
+            return date.fromordinal(self.date_ordinal).isoformat()
+        return self._raw_date
+
+    @date.setter
+    def date(self, value):
+        cleaned = self.clean_date(value)
+        self.date_ordinal = None
+        self._raw_date = None
+        if ISO_DATE.fullmatch(cleaned):
+            try:
+                self.date_ordinal = date.fromisoformat(cleaned).toordinal()
+                return
+            except ValueError:
+                pass
+        self._raw_date = cleaned
+
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -40,6 +99,28 @@ class Transaction:
             description=transaction.get('description')
         )
 
+    # rebuild from already-compact fields (e.g. the snapshot cache) without re-parsing amount and date;
+    # type and category are taken as given, so pass interned strings
+    @classmethod
+    def from_compact(cls, id, type, category, amount_minor, date_ordinal, raw_date, description):
+        txn = cls.__new__(cls)
+        txn.id = id
+        txn._type = type
+        txn._category = category
+        txn.amount_minor = amount_minor
+        txn.date_ordinal = date_ordinal
+        txn._raw_date = raw_date
+        txn.description = description
+        txn.seq = 0
+        return txn
+
+    # independent copy (type/category stay the same interned strings)
+    def copy(self):
+        txn = Transaction.from_compact(self.id, self._type, self._category, self.amount_minor,
+                                       self.date_ordinal, self._raw_date, self.description)
+        txn.seq = self.seq
+        return txn
+
     def __str__(self):
         return (f"ID : {self.id}\n"
                 f"Date : {self.date}\n"
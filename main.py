@@ -1,24 +1,22 @@
 import sys
 from rich.prompt import Prompt
 from core.manager import ExpenseManager
+from core.storage import open_user_storage
 from utils.json_io import get_transaction_file
 from utils.auth import login, signup
 from utils.display import print_header, print_success, print_warning, print_error, console, show_dashboard
-from datetime import datetime, date
+from datetime import date, timedelta
 from menu.main_menu import main_menu
 from core.category import CategoryManager
 
+# only the last year is loaded at login, older history is paged in when a query needs it
+HISTORY_WINDOW_DAYS = 366
 
 
 
 def handle_show_dashboard(manager, category_manager, user_name):
-    today_date = date.today()
-    current_year_month = datetime.today().strftime("%Y-%m")
-    today_summary = manager.get_daily_summary(today_date.strftime("%Y-%m-%d"))
-    month_summary = manager.get_monthly_summary(current_year_month)
-    top_categories = manager.get_top_categories(current_year_month, 5)
-    
-    show_dashboard(today_summary, month_summary, top_categories, user_name)
+    snapshot = manager.get_dashboard_snapshot(date.today(), top_n=5)
+    show_dashboard(snapshot, user_name)
   
     
 def handle_login_option():
@@ -29,8 +27,6 @@ def handle_login_option():
         if user_id:
             print_success(f"Welcome back, {username}!")
             current_user_id = user_id
-            manager = ExpenseManager(f"data/transactions_{user_id}.json")
-            manager.load_transactions()
             return username, current_user_id  
         else:
             print_error("Invalid credentials. Try again.\n")
@@ -79,7 +75,8 @@ def main():
             print_error("❗ Invalid choice. Please enter 1, 2, or 3.\n")
             
     user_filepath = get_transaction_file(current_user_id)
-    manager = ExpenseManager(filepath=user_filepath)
+    load_since = (date.today() - timedelta(days=HISTORY_WINDOW_DAYS)).strftime("%Y-%m-%d")
+    manager = ExpenseManager(filepath=user_filepath, storage=open_user_storage(current_user_id, user_filepath), load_since=load_since)
     category_manager = CategoryManager(current_user_id)  
             
     # handle_show_dashboard(manager, username)
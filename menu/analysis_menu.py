@@ -1,7 +1,6 @@
 from utils.validation import validate_date, validate_type
 from rich.prompt import Prompt
 from utils.display import print_section_title, print_warning, console, display_summary, Table, datetime, box, show_analysis_menu, print_error, print_txn_table, print_success
-from utils.filtering import filter_by_criteria, filter_by_month
 from utils.validation import validate_type, validate_category, validate_date
 
 
@@ -46,7 +45,7 @@ def handle_category_breakdown(manager, category_manager):
     
     if txn_list:
         type = validate_type("Enter type (income/expense)", allow_blank=False)
-        breakdown = get_category_breakdown(type, txn_list)
+        breakdown = manager.get_category_breakdown(type, txn_list)
             
         if not breakdown:
             print_warning("No data found for the selected type.")
@@ -134,7 +133,7 @@ def handle_filter(manager, category_manager, filter_usage=None):
     if apply_filters == "no":
         # Default: current month
         month_filter = current_month
-        transactions = filter_by_month(manager.transactions, month_filter)
+        transactions = manager.filter_transactions(month=month_filter)
         filter_summary = f"Month: {month_filter}"
    
     else:
@@ -161,8 +160,7 @@ def handle_filter(manager, category_manager, filter_usage=None):
         if filter_usage == "category breakdown":
             # Apply all filters
          
-            transactions = filter_by_criteria(
-            manager.transactions, 
+            transactions = manager.filter_transactions(
             type=type_filter, 
             category=category_filter,
             date=date_filter, 
@@ -190,8 +188,7 @@ def handle_filter(manager, category_manager, filter_usage=None):
                     categories, allow_blank=True
                 )
             
-            transactions = filter_by_criteria(
-            manager.transactions, 
+            transactions = manager.filter_transactions(
             type=type_filter, 
             category=category_filter,
             date=date_filter, 
@@ -239,22 +236,6 @@ def handle_filter(manager, category_manager, filter_usage=None):
         print_txn_table(txn_list)
 
 
-def get_category_breakdown(type_, txns):
-    category_wise_summary = {}
-    
-    for txn in txns:
-        if txn.type == type_:
-            category = txn.category
-            amount = txn.amount
-
-            if category in category_wise_summary:
-                category_wise_summary[category] += amount
-            else:
-                category_wise_summary[category] = amount
-
-    return category_wise_summary
-
-
 def analysis_main_menu(manager, category_manager):
     
     actions = {
@@ -1,10 +1,12 @@
-from utils.display import print_section_title, print_error, show_export_menu, datetime
+from utils.display import print_section_title, print_error, print_success, show_export_menu, show_export_job_report, console, datetime
 from utils.validation import validate_date
-from utils.filtering import filter_by_criteria
 from rich.prompt import Prompt
 from core.transaction import Transaction
 import os
 from core.export import Exporter
+from core.export_job import ExportJob
+from core.delta_export import DeltaExport
+import time
 
 
 # creates filename on the basis of filter and timestamp
@@ -58,8 +60,7 @@ def get_export_data(manager):
         print_error("Invalid option, Try again!")
     
     # --- Apply filters ---
-    export_transactions = filter_by_criteria(
-        manager.transactions,
+    export_transactions = manager.filter_transactions(
         type=None if type_option == "both" else type_option,
         category=None,
         from_date=from_date,
@@ -80,27 +81,85 @@ def handle_export(manager, extension: str):
     
 
     filename = get_export_filename(type_option, date_option, filter_value, extension)
-    data = [txn.to_dict() for txn in export_transactions.values()]
+    records = (txn.to_dict() for txn in export_transactions.values())     # streamed, never held as one list
     
     if extension == "csv":
-        Exporter.export_csv(data, filename)
+        Exporter.export_csv(records, filename)
     elif extension == "xlsx":
-        Exporter.export_excel(data, filename)
+        typed_columns = Prompt.ask("Store dates and amounts as typed cells?", choices=["yes", "no"], default="no") == "yes"
+        split_by_month = Prompt.ask("One sheet per month?", choices=["yes", "no"], default="no") == "yes"
+        Exporter.export_excel(records, filename, typed_columns=typed_columns, split_by_month=split_by_month)
     elif extension == "pdf":
-        Exporter.export_pdf(data, filename)
+        Exporter.export_pdf(records, filename)
     elif extension == "json":
-        Exporter.export_json(data, filename)
+        Exporter.export_json(records, filename)
+    elif extension == "ndjson":
+        Exporter.export_ndjson(records, filename)
     
 
     print(f"✅ Export complete! File saved at: {filename}")
 
 
-def export_main_menu(manager):
+# filters once and writes csv, xlsx, pdf and json side by side in worker processes
+def handle_export_all(manager):
+    export_transactions, type_option, date_option, filter_value = get_export_data(manager)
+
+    if not export_transactions:
+        print_error("No transactions found for the selected filters.")
+        return
+
+    job = ExportJob()
+    start = time.perf_counter()
+
+    def progress(result):
+        if result.ok:
+            print_success(f"{result.extension.upper()} written in {result.seconds:.2f}s")
+        else:
+            print_error(f"{result.extension.upper()} failed after {result.seconds:.2f}s")
+
+    with console.status(f"Exporting {len(export_transactions):,} transactions as {', '.join(job.formats).upper()}..."):
+        results = job.run(
+            export_transactions.values(),
+            lambda extension: get_export_filename(type_option, date_option, filter_value, extension),
+            progress=progress,
+        )
+
+    show_export_job_report(results, time.perf_counter() - start)
+
+
+# only what changed since the last export to a target (e.g. a nightly accounting sync), with tombstones for deletes
+def handle_delta_export(manager, user_id):
+    print_section_title("Delta Export", "🔄", color="cyan")
+
+    target = Prompt.ask("Export target", default="default").strip() or "default"
+    extension = Prompt.ask("Format", choices=list(DeltaExport.FORMATS), default="ndjson")
+
+    delta = DeltaExport(manager, user_id, target)
+    mark = delta.watermark()
+    if mark is None:
+        console.print(f"[dim]First export to '{target}' (or its change log was started over): every transaction is included.[/dim]")
+    else:
+        console.print(f"[dim]Last export to '{target}': {mark['exported_at']} (change #{mark['seq']})[/dim]")
+
+    result = delta.export(extension)
+    if not result.ok:
+        print_error("Delta export failed, the watermark was not moved.")
+    elif result.filename is None:
+        print_success(f"No changes since the last export to '{target}'.")
+    else:
+        print_success(f"{result.added} added, {result.updated} updated, {result.deleted} deleted "
+                      f"(changes up to #{result.to_seq}) exported to '{target}'.")
+
+
+def export_main_menu(manager, user_id=None):
     actions = {
         "1": lambda: handle_export(manager, "csv"),
         "2": lambda: handle_export(manager, "xlsx"),
         "3": lambda: handle_export(manager, "pdf"),
         "4": lambda: handle_export(manager, "json"),
+        "5": lambda: handle_export(manager, "ndjson"),
+        "6": lambda: handle_export_all(manager),
+        "7": lambda: handle_delta_export(manager, user_id),
         "0": lambda: None,
     }
     
@@ -0,0 +1,35 @@
+import os
+from rich.prompt import Prompt
+from utils.display import print_section_title, print_error, console, show_import_report
+from core.importer import TransactionImporter, DUPLICATE_MODES
+
+
+# import a bank statement csv or an earlier csv/json export into the ledger
+def handle_import(manager, category_manager):
+    print_section_title("Import Transactions", "📥", color="cyan")
+
+    filepath = Prompt.ask("Path of the .csv, .json or .ndjson file").strip().strip('"')
+    if not os.path.isfile(filepath):
+        print_error("File not found.")
+        return
+
+    date_format = Prompt.ask("Date format used in the file", default="%Y-%m-%d").strip()
+    duplicates = Prompt.ask("Rows that duplicate existing transactions", choices=list(DUPLICATE_MODES), default="skip")
+    rejects_path = f"{os.path.splitext(filepath)[0]}_rejected.csv"
+
+    importer = TransactionImporter(manager, categories=category_manager.view_categories(),
+                                   date_format=date_format, duplicates=duplicates)
+    try:
+        report = importer.import_file(
+            filepath,
+            rejects_path=rejects_path,
+            progress=lambda report: console.print(f"  … {report.rows:,} rows ({report.rows_per_sec:,.0f}/sec)", end="\r"),
+        )
+    except (OSError, UnicodeDecodeError, ValueError) as e:
+        print_error(f"Import failed, nothing was saved: {e}")
+        return
+
+    if not report.rejected and os.path.exists(rejects_path):
+        os.remove(rejects_path)
+    show_import_report(report, rejects_path)
+    input("\n[Press Enter to return to main menu...]")
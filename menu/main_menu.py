@@ -4,6 +4,7 @@ from menu.manage_menu import manage_main_menu
 from menu.analysis_menu import analysis_main_menu
 from menu.category_menu import manage_category_menu
 from menu.export_menu import export_main_menu
+from menu.import_menu import handle_import
 
 
 
@@ -22,7 +23,9 @@ def main_menu(manager, category_manager):
         elif choice == "3":
             manage_category_menu(category_manager)
         elif choice == "4":
-            export_main_menu(manager)
+            export_main_menu(manager, category_manager.user_id)
+        elif choice == "5":
+            handle_import(manager, category_manager)
         elif choice == "0":
             print_success("Thank you for using Personal Expense Tracker! 👋")
             exit()
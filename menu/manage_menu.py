@@ -34,6 +34,17 @@ def handle_add_transaction(manager, category_manager):
     description = validate_description("Enter description (optional)", allow_blank=True)
 
     transaction = Transaction(type, amount, category, txn_date, description=description)
+    exact, near = manager.find_duplicates(transaction)
+    if exact or near:
+        match = manager.transactions[(exact or near)[0]]
+        kind = "an identical" if exact else "a similar"
+        print_warning(f"This looks like {kind} transaction already recorded:")
+        console.print(str(match))
+        confirm = Prompt.ask("Add it anyway? (y/n)").strip().lower()
+        if confirm not in ['yes', 'y']:
+            print_warning("Transaction not added.")
+            return
+
     success = manager.add_transaction(transaction)
     if success:
         print_success("Transaction added successfully!")
@@ -50,11 +61,11 @@ def handle_update_transaction(manager, category_manager):
         
     txn_id = Prompt.ask("Enter the Transaction ID to update")
 
-    if txn_id not in manager.transactions:
+    current_txn = manager.get_transaction(txn_id)
+    if current_txn is None:
         print_error("Transaction ID not found.")
         return
 
-    current_txn = manager.transactions[txn_id]
     console.print("[dim]Press Enter to skip any field you don't want to change.[/dim]")
 
     new_type = validate_type("Enter new type (income/expense)", allow_blank=True)
@@ -0,0 +1,120 @@
+import os
+import tempfile
+import unittest
+
+from utils.json_io import BinaryCodec, CODECS, CorruptFileError
+
+
+def txn(txn_id, **fields):
+    return {"id": txn_id, "type": "expense", "amount": 12.5, "category": "Food", "date": "2025-07-01",
+            "description": None, **fields}
+
+
+class BinaryCodecTest(unittest.TestCase):
+    """Round trips through the binary snapshot codec: whatever is saved must come back unchanged."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.filepath = os.path.join(self.tmp.name, "transactions.bin")
+        self.codec = CODECS["binary"]
+
+
+    def round_trip(self, rows):
+        self.codec.save_items(self.filepath, ((row["id"], row) for row in rows))
+        return list(self.codec.iter_items(self.filepath))
+
+
+    def assertRoundTrips(self, rows):
+        self.assertEqual(self.round_trip(rows), [(row["id"], row) for row in rows])
+
+
+    def test_registered(self):
+        self.assertIsInstance(self.codec, BinaryCodec)
+        self.assertEqual(self.codec.suffix, ".bin")
+
+
+    def test_round_trip(self):
+        self.assertRoundTrips([
+            txn("a"),
+            txn("b", type="income", amount=50000.0, category="Salary", date="2024-12-31", description="pay"),
+            txn("c", amount=0.01, date="1999-01-01"),
+        ])
+
+
+    def test_unicode_descriptions(self):
+        self.assertRoundTrips([
+            txn("a", description="café crème"),
+            txn("b", description="₹ 500 — चाय"),
+            txn("c", description="party 🎉🍕", category="Entertainment 🎬"),    # astral characters
+            txn("d", description="🎉"),
+            txn("e", description="plain"),
+        ])
+
+
+    def test_unicode_ids(self):
+        self.assertRoundTrips([txn("ïd-1"), txn("😀"), txn("id-3")])
+
+
+    def test_none_and_empty_description_stay_apart(self):
+        rows = self.round_trip([txn("a", description=None), txn("b", description=""), txn("c", description=None)])
+        self.assertEqual([row["description"] for _, row in rows], [None, "", None])
+
+
+    def test_non_padded_dates(self):
+        self.assertRoundTrips([
+            txn("a", date="2025-7-1"),
+            txn("b", date="2025-07-01"),
+            txn("c", date="2025-12-5"),
+            txn("d", date="2025-02-30"),        # ISO shaped but not a real day
+            txn("e", date="2024-02-29"),
+        ])
+
+
+    def test_amounts_in_minor_units(self):
+        rows = self.round_trip([txn("a", amount=0.1 + 0.2), txn("b", amount=19.99), txn("c", amount=1234567.89)])
+        self.assertEqual([row["amount"] for _, row in rows], [0.3, 19.99, 1234567.89])
+
+
+    def test_missing_file(self):
+        self.assertEqual(list(self.codec.iter_items(self.filepath)), [])
+
+
+    def test_empty_file(self):
+        open(self.filepath, 'wb').close()
+        self.assertEqual(list(self.codec.iter_items(self.filepath)), [])
+
+
+    def test_no_rows(self):
+        self.assertEqual(self.round_trip([]), [])
+
+
+    def test_truncated_file(self):
+        self.round_trip([txn("a", description="héllo 🎉"), txn("b", date="2025-7-1"), txn("c", description="")])
+        with open(self.filepath, 'rb') as file:
+            data = file.read()
+
+        for size in range(1, len(data)):
+            with self.subTest(size=size):
+                with open(self.filepath, 'wb') as file:
+                    file.write(data[:size])
+                with self.assertRaises(CorruptFileError):
+                    list(self.codec.iter_items(self.filepath))
+
+
+    def test_not_a_binary_file(self):
+        with open(self.filepath, 'w') as file:
+            file.write('{"a": {}}')
+        with self.assertRaises(CorruptFileError):
+            list(self.codec.iter_items(self.filepath))
+
+
+    def test_same_items_as_json(self):
+        rows = [txn("a", description="🎉"), txn("b", date="2025-7-1", description=""), txn("c", type="income")]
+        json_path = os.path.join(self.tmp.name, "transactions.json")
+        CODECS["json"].save_items(json_path, ((row["id"], row) for row in rows))
+        self.assertEqual(self.round_trip(rows), list(CODECS["json"].iter_items(json_path)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest import mock
+
+from core.delta_export import DeltaExport
+from core.export import Exporter
+from core.manager import ExpenseManager
+from core.transaction import Transaction
+
+
+def txn(txn_id):
+    return Transaction(type="expense", amount=10.0, category="Food", date="2025-07-01", id=txn_id)
+
+
+class DeltaExportTest(unittest.TestCase):
+    """A change log that is deleted and started over must lead to a full export, never a silent gap."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.filepath = os.path.join(self.tmp.name, "transactions.json")
+        self.changes = os.path.join(self.tmp.name, "transactions.changes")
+        self.user = {}      # the account record the watermarks are kept in
+
+        for patcher in (
+            mock.patch("core.delta_export.load_user_info", lambda user_id: self.user),
+            mock.patch("core.delta_export.save_user_setting", lambda user_id, key, value: self.user.update({key: value})),
+            mock.patch.object(Exporter, "get_downloads_path", staticmethod(lambda: self.tmp.name)),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        with redirect_stdout(StringIO()):
+            self.manager = ExpenseManager(self.filepath)
+
+
+    def export(self):
+        with redirect_stdout(StringIO()):
+            return DeltaExport(self.manager, "u1").export()
+
+
+    def add(self, *txn_ids):
+        with redirect_stdout(StringIO()):
+            for txn_id in txn_ids:
+                self.manager.add_transaction(txn(txn_id))
+
+
+    def test_delta_after_full_export(self):
+        self.add("a", "b")
+        self.assertTrue(self.export().full)
+        self.add("c")
+        result = self.export()
+        self.assertFalse(result.full)
+        self.assertEqual(result.added, 1)
+
+
+    def test_deleted_log_forces_a_full_export(self):
+        self.add("a", "b")
+        self.export()
+        self.add("c")
+        self.export()
+
+        os.remove(self.changes)
+        self.add("d")
+        result = self.export()
+        self.assertTrue(result.full)
+        self.assertEqual(result.added, 4)
+
+        self.add("e")
+        result = self.export()
+        self.assertFalse(result.full)
+        self.assertEqual(result.added, 1)
+
+
+    def test_log_started_over_before_any_change(self):
+        self.add("a")
+        self.export()
+        os.remove(self.changes)
+
+        self.assertIsNone(DeltaExport(self.manager, "u1").watermark())
+        self.assertTrue(self.export().full)
+        self.add("b", "c")
+        self.assertEqual(self.export().added, 2)
+
+
+    def test_log_without_generation_keeps_its_watermark(self):
+        with open(self.changes, 'w') as file:
+            file.write('[1,"add","a"]\n')
+        self.user[DeltaExport.SETTING] = {"default": {"seq": 1, "offset": 14, "exported_at": "2025-07-01 10:00:00"}}
+        self.add("b")
+        result = self.export()
+        self.assertFalse(result.full)
+        self.assertEqual(result.added, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
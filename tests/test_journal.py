@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from core.manager import ExpenseManager
+from core.transaction import Transaction
+from utils.json_io import append_journal_records, get_journal_file, load_journal
+
+
+def txn(txn_id, amount=10.0):
+    return Transaction(type="expense", amount=amount, category="Food", date="2025-07-01", id=txn_id)
+
+
+class JournalTest(unittest.TestCase):
+    """A write torn by a crash must cost only the record being written, never the ones after it."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.filepath = os.path.join(self.tmp.name, "transactions.json")
+        self.journal = get_journal_file(self.filepath)
+
+
+    def tear_last_write(self, record_text):
+        with open(self.journal, 'a') as file:
+            file.write(record_text[:len(record_text) // 2])     # the crash: half a record, no newline
+
+
+    def load(self):
+        with redirect_stdout(StringIO()):
+            return ExpenseManager(self.filepath)
+
+
+    def test_appends_after_a_torn_write_survive(self):
+        manager = self.load()
+        manager.add_transaction(txn("a"))
+        self.tear_last_write('{"op":"add","id":"b","txn":{"id":"b","type":"expense","amount":5.0}}\n')
+
+        manager = self.load()
+        manager.add_transaction(txn("c"))
+        manager.update_transaction("a", {"amount": 99.0})
+
+        manager = self.load()
+        self.assertEqual(sorted(manager.transactions), ["a", "c"])
+        self.assertEqual(manager.transactions["a"].amount, 99.0)
+
+
+    def test_torn_record_in_the_middle_is_skipped(self):
+        append_journal_records(self.filepath, [{"op": "delete", "id": "x"}])
+        self.tear_last_write('{"op":"delete","id":"y"}\n')
+        append_journal_records(self.filepath, [{"op": "delete", "id": "z"}])
+
+        output = StringIO()
+        with redirect_stdout(output):
+            records = load_journal(self.filepath)
+        self.assertEqual([record["id"] for record in records], ["x", "z"])
+        self.assertIn("incomplete", output.getvalue())
+
+
+    def test_clean_journal_is_appended_as_is(self):
+        append_journal_records(self.filepath, [{"op": "delete", "id": "x"}])
+        append_journal_records(self.filepath, [{"op": "delete", "id": "y"}, {"op": "delete", "id": "z"}])
+        with open(self.journal) as file:
+            self.assertEqual(file.read().splitlines(), [
+                '{"op":"delete","id":"x"}', '{"op":"delete","id":"y"}', '{"op":"delete","id":"z"}',
+            ])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from core.storage import JsonStorage
+from utils.json_io import CODECS
+
+
+def row(txn_id, date, amount=10.0, type="expense"):
+    return {"id": txn_id, "type": type, "amount": amount, "category": "Food", "date": date, "description": None}
+
+
+class WindowedLoadTest(unittest.TestCase):
+    """A `since` window keeps only recent txns resident, whether the snapshot is parsed or read from its cache."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.filepath = os.path.join(self.tmp.name, "transactions.json")
+        rows = [row("old1", "2020-01-05"), row("new", "2025-07-01"), row("old2", "2021-03-09", 4.0, "income")]
+        CODECS["json"].save_items(self.filepath, ((r["id"], r) for r in rows))
+
+
+    def load(self, since="2025-01-01"):
+        storage = JsonStorage(self.filepath)
+        return storage, storage.load(since=since)
+
+
+    def test_cold_and_warm_cache_agree(self):
+        for label in ("parsed", "cached"):
+            with self.subTest(label):
+                storage, transactions = self.load()
+                self.assertEqual(list(transactions), ["new"])
+                self.assertEqual(storage.paged_out_ids, {"old1", "old2"})
+                self.assertEqual(storage.opening_balance, -600)
+                self.assertTrue(os.path.exists(storage.snapshot_cache.cache_path))
+
+
+    def test_cache_holds_the_whole_history(self):
+        self.load()
+        storage, transactions = self.load(since=None)
+        self.assertEqual(sorted(transactions), ["new", "old1", "old2"])
+
+
+    def test_corrupt_snapshot_writes_no_cache(self):
+        with open(self.filepath, 'w') as file:
+            file.write('{"a": {"id": "a", "type": "expense", "amount": 1')
+        with redirect_stdout(StringIO()):
+            storage, transactions = self.load()
+        self.assertEqual(transactions, {})
+        self.assertFalse(os.path.exists(storage.snapshot_cache.cache_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
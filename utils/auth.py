@@ -1,9 +1,12 @@
+import os
 import json
 import hashlib
 from pathlib import Path
 from datetime import datetime
+from utils.cache import file_cache
 
 USERS_FILE = Path("data") / "users.json"
+USERS_DIR = Path("data") / "users"
 DEFAULT_CATEGORIES = {
     "income": ["Salary", "Freelance", "Bonus", "Interest", "Other"], 
     "expense": ["Food", "Rent", "Utilities", "Transport", "Entertainment", "Health", "Shopping", "Other"]
@@ -27,44 +30,143 @@ def load_users():
         return {}
 
     try:
-        with open(USERS_FILE, 'r') as f:
-            return json.load(f)
+        return file_cache.load(USERS_FILE, json.load)
     except json.JSONDecodeError:
         print("⚠️ User file is empty or invalid. Resetting it.")
         USERS_FILE.write_text("{}")
         return {}
 
 
-def save_users(users):
-    with open(USERS_FILE, 'w') as f:
-        json.dump(users, f, indent=2)
+class AccountStore:
+    """
+    Accounts kept as one json record per user (users/<uid>.json) plus a username -> id index stored
+    as one small file per username (users/index/<hash>.json), so login, signup and settings updates
+    read and write only the files of that user. A legacy users.json is migrated on first use.
+    """
+
+    def __init__(self, dirpath=USERS_DIR, legacy_file=USERS_FILE):
+        self.dirpath = Path(dirpath)
+        self.legacy_file = Path(legacy_file)
+        self.index_dir = self.dirpath / "index"
+        self.meta_file = self.dirpath / "meta.json"
+
+
+    # record of a user, None if there is no such user (shared with the file cache, copy before changing it)
+    def get(self, user_id):
+        self._open()
+        return self._read(self._record_path(user_id))
 
 
-def signup(username, password):
-    users = load_users()
+    # update some fields of a user's record
+    def update(self, user_id, **fields):
+        record = self.get(user_id)
+        if record is None:
+            raise ValueError(f"User {user_id} not found")
+        self._write(self._record_path(user_id), {**record, **fields})
+
+
+    # id of the user with that username, None if it is not taken
+    def find_user_id(self, username):
+        self._open()
+        entry = self._read(self._index_path(username))
+        if entry is None or entry.get("username") != username:
+            return None
+        return entry["user_id"]
+
+
+    # store a new user under the next free id, None when the username is already taken. The id is
+    # claimed by creating its record exclusively (meta.json only says where to start looking), and
+    # the record is written before the username is claimed, so a crash never leaves a username
+    # that points at no account
+    def create(self, username, record):
+        self._open()
+        next_id = self._read(self.meta_file)["next_id"]
+        while True:
+            user_id = f"u{next_id:03}"
+            try:
+                with open(self._record_path(user_id), 'x') as file:
+                    json.dump(record, file, indent=2)
+                break
+            except FileExistsError:
+                next_id += 1
+
+        try:
+            with open(self._index_path(username), 'x') as file:     # claims the username atomically
+                json.dump({"username": username, "user_id": user_id}, file)
+        except FileExistsError:
+            os.remove(self._record_path(user_id))
+            return None
+
+        meta = self._read(self.meta_file)
+        if meta["next_id"] <= next_id:
+            self._write(self.meta_file, {**meta, "next_id": next_id + 1})
+        return user_id
+
+
+    # copy every account of a users.json dict into the store
+    def migrate(self, users):
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        for user_id, record in users.items():
+            self._write(self._record_path(user_id), record)
+            self._write(self._index_path(record["username"]), {"username": record["username"], "user_id": user_id})
+        self._write(self.meta_file, {"format": 1, "next_id": int(generate_user_id(users)[1:])})
+        return len(users)
+
+
+    # create the store on first use, moving the accounts of a legacy users.json into it
+    def _open(self):
+        if self.meta_file.exists():
+            return
+        users = load_users() if self.legacy_file.exists() else {}
+        count = self.migrate(users)
+        if self.legacy_file.exists():
+            os.replace(self.legacy_file, self.legacy_file.with_name(self.legacy_file.name + ".migrated"))
+            print(f"✅ Moved {count} accounts from {self.legacy_file} to {self.dirpath}")
 
-    for user in users.values():
-        if user["username"] == username:
-            return False
 
-    user_id = generate_user_id(users)
-    users[user_id] = {
+    def _record_path(self, user_id):
+        return self.dirpath / f"{user_id}.json"
+
+
+    def _index_path(self, username):
+        return self.index_dir / f"{hashlib.sha256(username.encode()).hexdigest()[:32]}.json"
+
+
+    @staticmethod
+    def _read(path):
+        try:
+            return file_cache.load(path, json.load)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+
+    # written to a temp file first so a crash never leaves a half-written record
+    # (one per process, so concurrent writers never move each other's temp file)
+    @staticmethod
+    def _write(path, data):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+
+
+accounts = AccountStore()
+
+
+def signup(username, password):
+    user_id = accounts.create(username, {
         "username": username,
         "password": hash_password(password),
         "created_at": datetime.now().isoformat(), 
         "categories": DEFAULT_CATEGORIES.copy()  # default categories
-    }
-    save_users(users)
-    return user_id
+    })
+    return user_id if user_id is not None else False
 
 
 def login(username, password):
-    users = load_users()
+    user_id = accounts.find_user_id(username)
+    user = accounts.get(user_id) if user_id is not None else None
 
-    for user_id, user in users.items():
-        if user["username"] == username and user["password"] == hash_password(password):
-            return user_id
+    if user is not None and user["password"] == hash_password(password):
+        return user_id
     return None
-
-
-# save or update categories part in users.json
\ No newline at end of file
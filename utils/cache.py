@@ -0,0 +1,107 @@
+import os
+from collections import OrderedDict
+
+
+class QueryCache:
+    """
+    Bounded LRU cache for query results of one ExpenseManager.
+    Every lookup carries the manager's version; when it changes, all entries are dropped,
+    so a result computed before a mutation is never served after it.
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+
+
+    # (found, value) for key at the given version
+    def get(self, key, version):
+        if version != self.version:
+            self.entries.clear()
+            self.version = version
+
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return True, self.entries[key]
+
+        self.misses += 1
+        return False, None
+
+
+    def put(self, key, version, value):
+        if version != self.version:
+            self.entries.clear()
+            self.version = version
+
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self.entries), "maxsize": self.maxsize}
+
+
+class FileCache:
+    """
+    Parsed contents of files, reused while a stat of the file still shows the same
+    (mtime_ns, size, inode). The atomic writers replace files with a new inode, so a rewrite is
+    always noticed even within the filesystem's mtime resolution. Cached values are shared:
+    callers must copy before mutating them. Set EXPENSE_TRACKER_DEBUG=1 to print every hit.
+    """
+
+    def __init__(self, debug=False):
+        self.entries = {}       # path -> (stamp, value)
+        self.debug = debug
+        self.hits = 0
+        self.misses = 0
+
+
+    # parse(file) of the file at path, from the cache when the file is unchanged;
+    # raises FileNotFoundError like open() when it does not exist
+    def load(self, path, parse):
+        path = os.fspath(path)
+        stat = os.stat(path)
+        stamp = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+        entry = self.entries.get(path)
+        if entry is not None and entry[0] == stamp:
+            self.hits += 1
+            if self.debug:
+                print(f"🔍 file cache hit: {path}")
+            return entry[1]
+
+        self.misses += 1
+        with open(path, 'r') as file:
+            value = parse(file)
+        self.entries[path] = (stamp, value)
+        return value
+
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self.entries)}
+
+
+file_cache = FileCache(debug=os.environ.get("EXPENSE_TRACKER_DEBUG") == "1")
+
+
+# criteria as filter_by_criteria applies them: exact date beats range beats month, blanks dropped
+def normalize_criteria(type=None, category=None, date=None, from_date=None, to_date=None, month=None):
+    normalized = []
+    if type:
+        normalized.append(("type", type))
+    if category:
+        normalized.append(("category", category))
+
+    if date:
+        normalized.append(("date", date))
+    elif from_date and to_date:
+        normalized.append(("range", from_date, to_date))
+    elif month:
+        normalized.append(("month", month))
+    return tuple(normalized)
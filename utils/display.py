@@ -8,6 +8,7 @@ from rich.rule import Rule
 
 
 from datetime import datetime, date
+import os
 
 
 
@@ -157,12 +158,13 @@ def display_summary(summary, title, is_today=False, period_label="day"):
 
 # ====================================== Dashboard =================================== # 
         
-def get_today_panel(today_summary, user_name):
+def get_today_panel(today_summary, user_name, today=None):
+        today = today or date.today()
         
         if today_summary['income'] > 0 or today_summary['expense'] > 0:
             
             today_panel = Panel.fit(
-        f"""📅 [b]Today: {date.today()}[/b]
+        f"""📅 [b]Today: {today}[/b]
 ├─ Income: ₹{today_summary['income']:.2f}
 ├─ Expense: ₹{today_summary['expense']:.2f}
 └─ Balance: ₹{today_summary['balance']:.2f} 
@@ -173,7 +175,7 @@ def get_today_panel(today_summary, user_name):
         )
         else:
             today_panel = Panel.fit(
-            f"""📅 [b]Today: {date.today()}[/b] 
+            f"""📅 [b]Today: {today}[/b] 
 [bold yellow]There are no transactions for today.[/bold yellow]
             """,
             title=f"📊 Welcome back, {user_name}!",
@@ -184,10 +186,11 @@ def get_today_panel(today_summary, user_name):
         return today_panel
        
       
-def get_monthly_panel(month_summary):
+def get_monthly_panel(month_summary, today=None):
+        today = today or date.today()
         if (month_summary['income'] > 0 or month_summary['expense'] > 0) or month_summary['carry_forward'] > 0:
             month_panel = Panel.fit(
-        f"""🗓️  [b]This Month: {date.today():%B %Y}[/b]
+        f"""🗓️  [b]This Month: {today:%B %Y}[/b]
 ├─ Total Income: ₹{month_summary['income']:.2f}
 ├─ Total Expense: ₹{month_summary['expense']:.2f}
 ├─ Carry Forward: ₹{month_summary['carry_forward']:.2f}
@@ -197,7 +200,7 @@ def get_monthly_panel(month_summary):
         )
         else:
             month_panel = Panel.fit(
-            f"""🗓️  [b]This Month: {date.today():%B %Y}[/b]
+            f"""🗓️  [b]This Month: {today:%B %Y}[/b]
 [bold yellow]There are no transactions for this month.[/bold yellow]    
             """,
             border_style="green",
@@ -245,11 +248,12 @@ def get_footer_panel(month_summary):
     return footer_panel
     
     
-def show_dashboard(today_summary, month_summary, top_categories, user_name):
-    today_panel = get_today_panel(today_summary, user_name)
-    month_panel = get_monthly_panel(month_summary)
-    category_panel = get_category_panel(top_categories)
-    footer_panel = get_footer_panel(month_summary)
+# snapshot: core.dashboard.DashboardSnapshot from manager.get_dashboard_snapshot()
+def show_dashboard(snapshot, user_name):
+    today_panel = get_today_panel(snapshot.today_summary, user_name, snapshot.today)
+    month_panel = get_monthly_panel(snapshot.month_summary, snapshot.today)
+    category_panel = get_category_panel(snapshot.top_categories)
+    footer_panel = get_footer_panel(snapshot.month_summary)
     
     row_1 = Columns([today_panel, month_panel, category_panel], equal=True, expand=True)
     row_2 = Columns([footer_panel], align="center", expand=True)
@@ -275,6 +279,7 @@ def show_main_menu():
     table.add_row("2", "📊  Analysis")
     table.add_row("3", "📋  Manage Categories")
     table.add_row("4", "📁  Export Documents")
+    table.add_row("5", "📥  Import Transactions")
     table.add_row("0", "🚪  Exit")
 
     console.print(Panel.fit(table, title="📟 Expense Tracker Console", border_style="cyan", padding=(1, 2)))
@@ -325,6 +330,53 @@ def show_export_menu():
     table.add_row("2", "📊  Export EXCEL")
     table.add_row("3", "📥  Export PDF")
     table.add_row("4", "♻️  Back Up Data")
+    table.add_row("5", "🧾  Export NDJSON")
+    table.add_row("6", "📦  Export All Formats")
+    table.add_row("7", "🔄  Delta Export (changes since last export)")
     table.add_row("0", "🔙  Back to Main Menu")
 
-    console.print(Panel.fit(table, title="📋  Export Files", border_style="cyan", padding=(1, 2)))
\ No newline at end of file
+    console.print(Panel.fit(table, title="📋  Export Files", border_style="cyan", padding=(1, 2)))
+
+
+def show_export_job_report(results, seconds):
+    table = Table(box=box.SIMPLE)
+    table.add_column("Format", style="bold")
+    table.add_column("Status")
+    table.add_column("Time", justify="right")
+    table.add_column("File")
+    for result in results:
+        status = "[green]done[/green]" if result.ok else "[red]failed[/red]"
+        table.add_row(result.extension.upper(), status, f"{result.seconds:.2f}s", os.path.basename(result.filepath))
+    console.print(Panel.fit(table, title="📦 Export All Formats", border_style="cyan"))
+
+    total = sum(result.seconds for result in results)
+    console.print(f"[dim]Finished in {seconds:.2f}s ({total:.2f}s of work across formats), saved in {os.path.dirname(results[0].filepath)}[/dim]")
+    for result in results:
+        if not result.ok:
+            print_error(f"{result.extension.upper()}: {result.output}")
+
+
+def show_import_report(report, rejects_path=None):
+    table = Table(box=box.SIMPLE, show_header=False)
+    table.add_column("Metric", style="bold")
+    table.add_column("Value", justify="right")
+    table.add_row("Rows read", f"{report.rows:,}")
+    table.add_row("Imported", f"[green]{report.imported:,}[/green]")
+    table.add_row("Skipped (already present)", f"{report.skipped:,}")
+    table.add_row("Duplicates skipped", f"{report.duplicates:,}")
+    if report.near_duplicates:
+        table.add_row("Possible duplicates (added)", f"[yellow]{report.near_duplicates:,}[/yellow]")
+    if report.merged:
+        table.add_row("Merged into existing", f"{report.merged:,}")
+    if report.tagged:
+        table.add_row("Tagged as possible duplicate", f"[yellow]{report.tagged:,}[/yellow]")
+    table.add_row("Rejected", f"[red]{report.rejected:,}[/red]")
+    table.add_row("Time", f"{report.seconds:.2f}s ({report.rows_per_sec:,.0f} rows/sec)")
+    console.print(Panel.fit(table, title="📥 Import Report", border_style="cyan"))
+
+    for row_number, reason in report.rejected_samples:
+        print_warning(f"Row {row_number}: {reason}")
+    if report.rejected > len(report.rejected_samples):
+        print_warning(f"... and {report.rejected - len(report.rejected_samples):,} more")
+    if report.rejected and rejects_path:
+        print_warning(f"All rejected rows were written to {rejects_path}")
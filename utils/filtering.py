@@ -1,26 +1,138 @@
 from datetime import datetime
-
-
-def filter_by_criteria(transactions:dict, type=None, category=None, date=None, from_date=None, to_date=None, month=None):
-    filtered_transactions = transactions
-    
-    if type:
-        filtered_transactions = filter_by_type(transactions, type)
-
-    if category:
-        filtered_transactions = filter_by_category(filtered_transactions, category)
-
-    if date:
-        filtered_transactions = filter_by_date(filtered_transactions, date)
-        
-    elif from_date and to_date:  # Only apply date range if exact date is not specified
-        filtered_transactions = filter_by_date_range(filtered_transactions, from_date, to_date)
-    
-    elif month:  # Only apply month filter if no date filters are applied
-        filtered_transactions = filter_by_month(filtered_transactions, month)
-
-
-    return filtered_transactions
+from collections.abc import Mapping
+
+
+class TransactionView(Mapping):
+    """
+    Read-only {txn_id: txn} view over a subset of a transactions dict.
+    Holds only the matching ids, so filtering never copies the working set into new dicts.
+    """
+
+    def __init__(self, transactions, ids):
+        self._transactions = transactions
+        self._ids = ids
+        self._id_set = None     # built on first membership check
+
+    def __getitem__(self, txn_id):
+        if self._id_set is None:
+            self._id_set = set(self._ids)
+        if txn_id not in self._id_set:
+            raise KeyError(txn_id)
+        return self._transactions[txn_id]
+
+    def __iter__(self):
+        return iter(self._ids)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __bool__(self):
+        return bool(self._ids)
+
+    def __repr__(self):
+        return f"TransactionView({len(self._ids)} transactions)"
+
+
+class TransactionQuery:
+    """
+    All filter_by_criteria predicates compiled into a single check per txn.
+    Date criteria follow the same precedence: exact date, then from/to range, then month.
+    """
+
+    def __init__(self, type=None, category=None, date=None, from_date=None, to_date=None, month=None):
+        self.type = type
+        self.category = category
+        self.date = date
+        self.from_date = from_date
+        self.to_date = to_date
+        self.month = month
+        self.predicate = self._compile()
+
+
+    # whether the query has a date criterion an index can answer
+    @property
+    def has_date_criterion(self):
+        return bool(self.date or (self.from_date and self.to_date) or self.month)
+
+
+    # run the query, letting the most selective available index pick the candidates; results are in
+    # ledger order (Transaction.seq) whichever index drove them, like a scan of the dict
+    def run(self, transactions, date_index=None, posting_index=None):
+        driver, candidates = self._plan(date_index, posting_index)
+
+        if driver is None:
+            predicate = self.predicate
+            if predicate is None:
+                return TransactionView(transactions, list(transactions))
+            return TransactionView(transactions, [txn_id for txn_id, txn in transactions.items() if predicate(txn)])
+
+        residual = self._compile(skip=driver)
+        if residual is None:
+            ids = list(candidates)
+        else:
+            ids = [txn_id for txn_id in candidates if residual(transactions[txn_id])]
+        ids.sort(key=lambda txn_id: transactions[txn_id].seq)
+        return TransactionView(transactions, ids)
+
+
+    # choose the criterion with the fewest candidate ids; (None, None) means scan everything
+    def _plan(self, date_index, posting_index):
+        options = []
+        if date_index is not None and self.has_date_criterion:
+            estimate = date_index.count(date=self.date, from_date=self.from_date, to_date=self.to_date, month=self.month)
+            options.append((estimate, "date"))
+        if posting_index is not None and self.type:
+            options.append((len(posting_index.ids_of_type(self.type)), "type"))
+        if posting_index is not None and self.category:
+            options.append((len(posting_index.ids_in_category(self.category)), "category"))
+
+        if not options:
+            return None, None
+
+        _, driver = min(options)
+        if driver == "date":
+            return driver, date_index.lookup(date=self.date, from_date=self.from_date, to_date=self.to_date, month=self.month)
+        elif driver == "type":
+            return driver, posting_index.ids_of_type(self.type)
+        return driver, posting_index.ids_in_category(self.category)
+
+
+    # combine the active criteria into one function, None when nothing is filtered
+    def _compile(self, skip=None):
+        include_date = skip != "date"
+        checks = []
+        if self.type and skip != "type":
+            type_ = self.type
+            checks.append(lambda txn: txn.type == type_)
+
+        if self.category and skip != "category":
+            category = self.category
+            checks.append(lambda txn: txn.category == category)
+
+        if include_date and self.date:
+            exact = self.date
+            checks.append(lambda txn: txn.date == exact)
+
+        elif include_date and self.from_date and self.to_date:
+            start_date = datetime.strptime(self.from_date, "%Y-%m-%d")
+            end_date = datetime.strptime(self.to_date, "%Y-%m-%d")
+            checks.append(lambda txn: start_date <= datetime.strptime(txn.date, "%Y-%m-%d") <= end_date)
+
+        elif include_date and self.month:
+            month = self.month
+            checks.append(lambda txn: txn.date.startswith(month))
+
+        if not checks:
+            return None
+        if len(checks) == 1:
+            return checks[0]
+        return lambda txn: all(check(txn) for check in checks)
+
+
+def filter_by_criteria(transactions:dict, type=None, category=None, date=None, from_date=None, to_date=None, month=None, date_index=None, posting_index=None):
+    # with indexes (see core.indexes) the most selective criterion becomes a lookup instead of a scan
+    query = TransactionQuery(type=type, category=category, date=date, from_date=from_date, to_date=to_date, month=month)
+    return query.run(transactions, date_index=date_index, posting_index=posting_index)
 
 
 
@@ -1,10 +1,15 @@
 import os
+import re
+import sys
 import json
+import struct
+from array import array
+from datetime import date
 from pathlib import Path
-from utils.auth import load_users, save_users
+from utils.auth import accounts
+from utils.cache import file_cache
 
 DATA_DIR = Path("data")  # base folder for JSON files
-USERS_FILE = Path("data") / "users.json"
 
 
 # get loggined user txn file
@@ -24,18 +29,17 @@ def save_user_data(user_id, transactions):
     save_data(filepath, transactions)
 
 
-# loads data from file 
+# loads data from file (parsed once and reused while the file is unchanged, so copy before changing it)
 def load_data(filepath):
     if not os.path.exists(filepath):
         return {}
 
     try:
-        with open(filepath, 'r') as file:
-            data = json.load(file)
-            if isinstance(data, dict):
-                return data
-            else:
-                return {}
+        data = file_cache.load(filepath, json.load)
+        if isinstance(data, dict):
+            return data
+        else:
+            return {}
 
     except json.JSONDecodeError:
         print("⚠️ JSON file is empty or corrupted. Starting fresh.")
@@ -46,37 +50,393 @@ def load_data(filepath):
         return {}
 
 
-# save data to file
+class JsonStream:
+    """Incremental reader over an open json file: look at the next token, step over it, or decode one value."""
+
+    def __init__(self, file, chunk_size=1 << 16):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+
+    # next non-whitespace char without consuming it, "" at the end of the file
+    def peek(self):
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buffer) or self.eof:
+                return self.buffer[self.pos] if self.pos < len(self.buffer) else ""
+            self.buffer, self.pos = self.file.read(self.chunk_size), 0
+            self.eof = not self.buffer
+
+
+    # consume the next char, which must be one of chars
+    def expect(self, chars):
+        char = self.peek()
+        if not char or char not in chars:
+            raise json.JSONDecodeError(f"Expecting one of {chars!r}", self.buffer, self.pos)
+        self.pos += 1
+        return char
+
+
+    # decode one json value, reading more of the file until it is complete
+    def decode(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            chunk = self.file.read(self.chunk_size)
+            self.eof = not chunk
+            self.buffer = self.buffer[self.pos:] + chunk
+            self.pos = 0
+
+
+    # (key, value) pairs of the object starting at the next token
+    def iter_object(self):
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.decode()
+            self.expect(":")
+            yield key, self.decode()
+            if self.expect(",}") == "}":
+                return
+
+
+    # values of the array starting at the next token
+    def iter_array(self):
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.decode()
+            if self.expect(",]") == "]":
+                return
+
+
+# streams (key, value) pairs of a top-level json object one at a time, without loading the whole file
+def iter_data_items(filepath, chunk_size=1 << 16):
+    if not os.path.exists(filepath):
+        return
+
+    with open(filepath, 'r') as file:
+        stream = JsonStream(file, chunk_size)
+        if stream.peek() != "{":
+            return      # empty file or not an object, same as load_data returning {}
+        yield from stream.iter_object()
+
+
+# streams the txn dicts of a json export ({"metadata": ..., "data": [...]}), a plain json array
+# or a snapshot object ({txn_id: txn}); only one record is decoded at a time
+def iter_json_records(filepath, chunk_size=1 << 16):
+    with open(filepath, 'r', encoding='utf-8') as file:
+        stream = JsonStream(file, chunk_size)
+        if stream.peek() == "[":
+            yield from stream.iter_array()
+            return
+
+        stream.expect("{")
+        while stream.peek() not in ("}", ""):
+            key = stream.decode()
+            stream.expect(":")
+            if key == "data" and stream.peek() == "[":
+                yield from stream.iter_array()
+            else:
+                value = stream.decode()
+                if isinstance(value, dict) and key != "metadata":
+                    yield {"id": key, **value}
+            stream.expect(",}")
+
+
+# writes (key, value) pairs as one json object in the same layout as json.dump(..., indent=4),
+# one item at a time (through a temp file so a crash never leaves a half-written snapshot)
+def save_data_items(filepath, items):
+    tmp_path = f"{filepath}.tmp"
+    with open(tmp_path, 'w') as file:
+        first = True
+        for key, value in items:
+            file.write("{\n    " if first else ",\n    ")
+            file.write(json.dumps(key) + ": " + _dump_indented(value))
+            first = False
+        file.write("{}" if first else "\n}")
+    os.replace(tmp_path, filepath)
+
+
+# json.dumps(value, indent=4) nested one level deep; flat dicts of scalars (every txn) are formatted
+# directly with the C string encoder, since indent=... forces json's much slower pure-python encoder
+def _dump_indented(value):
+    if isinstance(value, dict) and value and all(_is_scalar(item) for item in value.values()):
+        fields = ",\n        ".join(
+            f"{json.encoder.encode_basestring_ascii(str(name))}: {_dump_scalar(item)}" for name, item in value.items()
+        )
+        return "{\n        " + fields + "\n    }"
+    return json.dumps(value, indent=4).replace("\n", "\n    ")
+
+
+def _is_scalar(value):
+    return value is None or isinstance(value, (str, int, float))
+
+
+def _dump_scalar(value):
+    if isinstance(value, str):
+        return json.encoder.encode_basestring_ascii(value)
+    if value is None:
+        return "null"
+    if type(value) is float and value - value == 0:     # finite
+        return float.__repr__(value)
+    return json.dumps(value)
+
+
+# save data to file (written to a temp file first so a crash never leaves a half-written snapshot)
 def save_data(filepath, transactions):
     if not isinstance(transactions, dict):
         raise ValueError("Data must be a dictionary with transaction IDs as keys")
 
-    with open(filepath, 'w') as file:
+    tmp_path = f"{filepath}.tmp"
+    with open(tmp_path, 'w') as file:
         json.dump(transactions, file, indent=4)
+    os.replace(tmp_path, filepath)
+
+
+class CorruptFileError(ValueError):
+    """A snapshot file that exists but cannot be decoded."""
+
+
+class JsonCodec:
+    """Snapshot as one indented json object of {txn_id: txn dict} (the original format)."""
+
+    name = "json"
+    suffix = ".json"
+
+    def iter_items(self, filepath):
+        return iter_data_items(filepath)
+
+
+    def save_items(self, filepath, items):
+        save_data_items(filepath, items)
+
 
+class BinaryCodec:
+    """
+    Columnar binary snapshot: magic + row count, then length-prefixed columns (ids, type, category,
+    amount in minor units, date ordinal, raw dates, description). Type, category and description are
+    dictionary encoded (code 0 is None); zero-padded ISO dates are stored as ordinals and any other
+    date string goes to the raw dates column (ordinal 0). Integers are little-endian.
+    """
 
-# loading user info for categories
+    name = "binary"
+    suffix = ".bin"
+    MAGIC = b"ETXB\x01"
+    ISO_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+    # (txn_id, txn dict) pairs, like iter_data_items; the file is decoded as a whole
+    def iter_items(self, filepath):
+        if not os.path.exists(filepath):
+            return
+        with open(filepath, 'rb') as file:
+            data = file.read()
+        if not data:
+            return
+        if not data.startswith(self.MAGIC):
+            raise CorruptFileError("Not a binary transaction file")
+
+        try:
+            (count,) = struct.unpack_from("<I", data, len(self.MAGIC))
+            columns = []
+            pos = len(self.MAGIC) + 4
+            for _ in range(7):
+                (size,) = struct.unpack_from("<I", data, pos)
+                columns.append(data[pos + 4:pos + 4 + size])
+                pos += 4 + size
+
+            ids = self._decode_strings(columns[0])
+            types = self._decode_dictionary(columns[1])
+            categories = self._decode_dictionary(columns[2])
+            amounts = self._decode_ints("q", columns[3])
+            ordinals = self._decode_ints("i", columns[4])
+            raw_dates = iter(self._decode_strings(columns[5]))
+            descriptions = self._decode_dictionary(columns[6])
+        except (struct.error, IndexError, ValueError):
+            raise CorruptFileError("Binary transaction file is truncated or damaged")
+        if not len(ids) == len(types) == len(categories) == len(amounts) == len(ordinals) == len(descriptions) == count:
+            raise CorruptFileError("Binary transaction file is truncated or damaged")
+
+        for txn_id, type_, category, amount, ordinal, description in zip(ids, types, categories, amounts, ordinals, descriptions):
+            yield txn_id, {
+                "id": txn_id,
+                "type": type_,
+                "amount": amount / 100,
+                "category": category,
+                "date": date.fromordinal(ordinal).isoformat() if ordinal else next(raw_dates),
+                "description": description,
+            }
+
+
+    def save_items(self, filepath, items):
+        ids, types, categories, amounts, ordinals, raw_dates, descriptions = [], [], [], array("q"), array("i"), [], []
+        for txn_id, txn in items:
+            ids.append(txn_id)
+            types.append(txn.get("type"))
+            categories.append(txn.get("category"))
+            amounts.append(round(float(txn["amount"]) * 100))
+            ordinal = self._ordinal(txn.get("date"))
+            ordinals.append(ordinal)
+            if not ordinal:
+                raw_dates.append(str(txn.get("date")))
+            descriptions.append(txn.get("description"))
+
+        columns = (
+            self._encode_strings(ids), self._encode_dictionary(types), self._encode_dictionary(categories),
+            self._encode_ints(amounts), self._encode_ints(ordinals), self._encode_strings(raw_dates),
+            self._encode_dictionary(descriptions),
+        )
+        tmp_path = f"{filepath}.tmp"
+        with open(tmp_path, 'wb') as file:
+            file.write(self.MAGIC + struct.pack("<I", len(ids)))
+            for column in columns:
+                file.write(struct.pack("<I", len(column)))
+                file.write(column)
+        os.replace(tmp_path, filepath)
+
+
+    @classmethod
+    def _ordinal(cls, value):
+        if isinstance(value, str) and cls.ISO_DATE.fullmatch(value):
+            try:
+                return date.fromisoformat(value).toordinal()
+            except ValueError:
+                pass
+        return 0
+
+
+    # strings as a count, their lengths (in characters) and one utf-8 blob
+    @classmethod
+    def _encode_strings(cls, values):
+        lengths = array("I", (len(value) for value in values))
+        return struct.pack("<I", len(values)) + cls._encode_ints(lengths) + "".join(values).encode("utf-8")
+
+
+    @classmethod
+    def _decode_strings(cls, data):
+        (count,) = struct.unpack_from("<I", data)
+        lengths = cls._decode_ints("I", data[4:4 + 4 * count])
+        text = data[4 + 4 * count:].decode("utf-8")
+        values, pos = [], 0
+        for length in lengths:
+            values.append(text[pos:pos + length])
+            pos += length
+        return values
+
+
+    # distinct values (strings) plus one code per row, 0 standing for None
+    @classmethod
+    def _encode_dictionary(cls, values):
+        codes, entries = array("I"), {}
+        for value in values:
+            codes.append(0 if value is None else entries.setdefault(str(value), len(entries) + 1))
+        entries = cls._encode_strings(list(entries))
+        return struct.pack("<I", len(entries)) + entries + cls._encode_ints(codes)
+
+
+    @classmethod
+    def _decode_dictionary(cls, data):
+        (size,) = struct.unpack_from("<I", data)
+        entries = [None] + [sys.intern(value) for value in cls._decode_strings(data[4:4 + size])]
+        return [entries[code] for code in cls._decode_ints("I", data[4 + size:])]
+
+
+    @staticmethod
+    def _encode_ints(values):
+        if sys.byteorder == "big":
+            values = array(values.typecode, values)
+            values.byteswap()
+        return values.tobytes()
+
+
+    @staticmethod
+    def _decode_ints(typecode, data):
+        values = array(typecode)
+        values.frombytes(data)
+        if sys.byteorder == "big":
+            values.byteswap()
+        return values
+
+
+CODECS = {codec.name: codec for codec in (JsonCodec(), BinaryCodec())}
+
+
+# journal file that sits next to a snapshot file
+def get_journal_file(filepath):
+    return Path(filepath).with_suffix(".journal")
+
+
+# append several mutation records with a single write
+def append_journal_records(filepath, records):
+    data = "".join(json.dumps(record, separators=(",", ":")) + "\n" for record in records).encode('utf-8')
+    with open(get_journal_file(filepath), 'a+b') as file:
+        if file.seek(0, os.SEEK_END):
+            file.seek(-1, os.SEEK_END)
+            if file.read(1) != b"\n":
+                data = b"\n" + data        # the last write was torn: start on a fresh line
+        file.write(data)
+
+
+# read journal records in the order they were written
+def load_journal(filepath):
+    journal_path = get_journal_file(filepath)
+    if not journal_path.exists():
+        return []
+
+    records = []
+    torn = 0
+    with open(journal_path, 'r', encoding='utf-8') as file:
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                torn += 1       # a write torn by a crash, the records around it are still valid
+    if torn:
+        print(f"⚠️ Journal has {torn} incomplete record(s). Ignoring them.")
+    return records
+
+
+# drop the journal once its records are folded into the snapshot
+def clear_journal(filepath):
+    journal_path = get_journal_file(filepath)
+    if journal_path.exists():
+        journal_path.unlink()
+
+
+# loading user info for categories (reads only that user's record)
 def load_user_info(user_id):
-    try:
-        with open(USERS_FILE, 'r') as file:
-            data = json.load(file)
-            return data.get(user_id)  # Returns user data or None if not found
-    except FileNotFoundError:
-        return None 
-    except json.JSONDecodeError:
-        return None  
+    return accounts.get(user_id)  # Returns user data or None if not found
 
 
 # saving user info for categories
 def save_user_info(user_id, categories):
     try:
-        users = load_users()
-        if user_id in users:
-            users[user_id]['categories'] = categories
-            save_users(users)
-        else:
-            raise ValueError(f"User {user_id} not found")
+        accounts.update(user_id, categories=categories)
     except Exception as e:
         print(f"Error saving categories: {e}")
         return False
-    return True
\ No newline at end of file
+    return True
+
+
+# saving a single per-user setting (e.g. storage backend)
+def save_user_setting(user_id, key, value):
+    accounts.update(user_id, **{key: value})
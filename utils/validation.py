@@ -1,22 +1,72 @@
-from datetime import datetime
+import re
+import math
+from datetime import datetime, date
 from rich.prompt import Prompt
 from utils.display import print_error
 
 
+# ================================ Rules (no prompts) ================================ #
+# each returns the cleaned value or raises ValueError with the message shown to the user
+
+ISO_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+def parse_amount(value):
+    try:
+        amount = float(str(value).strip())
+    except ValueError:
+        raise ValueError("Please enter a valid number.")
+
+    if not math.isfinite(amount):
+        raise ValueError("Please enter a valid number.")
+    if not math.isfinite(amount * 100):
+        raise ValueError("Amount is too large.")      # stored in minor units
+    if amount > 0:
+        return amount
+    raise ValueError("Amount must be greater than 0.")
+
+
+def parse_type(value):
+    value = str(value).strip().lower()
+    if value in ("income", "expense"):
+        return value
+    raise ValueError("Type must be 'income' or 'expense'.")
+
+
+def parse_date(value):
+    value = str(value).strip()
+    try:
+        if ISO_DATE.fullmatch(value):
+            date.fromisoformat(value)      # same check as strptime for zero-padded dates, much faster
+        else:
+            datetime.strptime(value, "%Y-%m-%d")
+        return value
+    except ValueError:
+        raise ValueError("Date must be in YYYY-MM-DD format.")
+
+
+def parse_category(value, category_list):
+    value = str(value).strip()
+    if value in category_list:
+        return value
+    raise ValueError(f"Invalid category. Choose from: {', '.join(category_list)}")
+
+
+def parse_description(value):
+    value = str(value).strip() if value is not None else ""
+    return value if value else None
+
+
+# ================================ Prompts ================================ #
+
+
 def validate_amount(prompt, allow_blank=True):
     while True:
         try:
-            value = float(Prompt.ask(prompt).strip())
+            return parse_amount(Prompt.ask(prompt))
+        except ValueError as e:
+            print_error(str(e))
 
-            if allow_blank and value == "":
-                return None  # user skipped
-
-            if value > 0:
-                return value
-            print_error("Amount must be greater than 0.")
-        except ValueError:
-            print_error("Please enter a valid number.")
-            
 
 def validate_type(prompt, allow_blank=True):
     while True:
@@ -24,10 +74,11 @@ def validate_type(prompt, allow_blank=True):
         if allow_blank and value == "":
             return None  # user skipped
 
-        if value in ("income", "expense"):
-            return value
-        print_error("Type must be 'income' or 'expense'.")
-        
+        try:
+            return parse_type(value)
+        except ValueError as e:
+            print_error(str(e))
+
 
 def validate_date(prompt, allow_blank=True):
     while True:
@@ -36,10 +87,9 @@ def validate_date(prompt, allow_blank=True):
             return None  # user skipped
 
         try:
-            datetime.strptime(value, "%Y-%m-%d")
-            return value
-        except ValueError:
-            print_error("Date must be in YYYY-MM-DD format.")
+            return parse_date(value)
+        except ValueError as e:
+            print_error(str(e))
 
 
 def validate_category(prompt, category_list, allow_blank=True):
@@ -47,13 +97,14 @@ def validate_category(prompt, category_list, allow_blank=True):
         value = Prompt.ask(prompt, show_default=True).strip()
         if allow_blank and value == "":
             return None  # user skipped
-        
+
         if value == "new":
             return value
 
-        if value in category_list:
-            return value
-        print_error(f"Invalid category. Choose from: {', '.join(category_list)}")
+        try:
+            return parse_category(value, category_list)
+        except ValueError as e:
+            print_error(str(e))
 
 
 def validate_description(prompt, allow_blank=True):
@@ -61,4 +112,4 @@ def validate_description(prompt, allow_blank=True):
     if allow_blank and value == "":
             return None  # user skipped
 
-    return value if value else None
+    return parse_description(value)